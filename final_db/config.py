@@ -8,6 +8,15 @@ REGION = "us-east-1"
 NVD_TABLE = "infoservices-cybersecurity-vuln-nvd-data"
 FINAL_TABLE = "infoservices-cybersecurity-vuln-final-data"
 METADATA_TABLE = "infoservices-cybersecurity-vuln-sync-metadata"
+CVE_INDEX_TABLE = "infoservices-cybersecurity-vuln-cveindex"
+
+# Optional DAX cluster for read-heavy lookups (e.g. "dax://my-cluster.xxxx.dax-clusters.us-east-1.amazonaws.com").
+# When set, CVE index reads go through DAX; all writes still use DynamoDB directly.
+DAX_ENDPOINT = None
+
+# Merge every left-joined source per CVE in memory and write each final row once
+# (instead of once per source). Set False to write source by source.
+COALESCE_SOURCE_WRITES = True
 
 # Regex for validating CVE IDs (e.g., CVE-2022-30190)
 CVE_PATTERN = re.compile(r"^CVE-\d{4}-\d{4,}$", re.IGNORECASE)
@@ -7,11 +7,10 @@ Export all columns from the Final Vulnerability Table → CSV
 - Writes clean CSV file
 """
 
-import boto3
 import csv
 import logging
 from decimal import Decimal
-from utils.dynamo_helpers import parallel_scan  # ✅ your existing high-speed helper
+from utils.dynamo_helpers import get_ddb_resource, parallel_scan  # ✅ your existing high-speed helper
 
 # ============================
 # CONFIGURATION
@@ -46,7 +45,7 @@ def _convert_decimal(obj):
 # Export Logic
 # ============================
 def export_final_table_to_csv():
-    dynamodb = boto3.resource("dynamodb", region_name=REGION)
+    dynamodb = get_ddb_resource(REGION)  # adaptive retries cover scan throttling
     table = dynamodb.Table(TABLE_NAME)
 
     log.info(f"📥 Starting full parallel scan of table '{TABLE_NAME}' ...")
@@ -8,13 +8,11 @@ Auto Merge: NVD Table → Final Table (safe merge mode)
 - Skips empty/null fields and retries failed updates
 """
 
-import boto3
 import logging
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from botocore.config import Config
 from utils.cve_utils import normalize_cve
-from utils.dynamo_helpers import parallel_scan
+from utils.dynamo_helpers import get_ddb_resource, parallel_scan
 
 # ---------- CONFIG ----------
 REGION = "us-east-1"
@@ -23,14 +21,18 @@ FINAL_TABLE = "infoservices-cybersecurity-vuln-final-data"
 MAX_WORKERS = 16
 SCAN_SEGMENTS = 8
 
+# Resolved once at import instead of rebuilding lists for every field of every record
+SKIP_KEYS = frozenset({"id", "cve_id", "name"})
+NULL_STRINGS = frozenset({"", "null", "None"})
+
 # ---------- LOGGING ----------
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("nvd-auto-merge")
 
 # ---------- SETUP ----------
 def setup_dynamodb():
-    cfg = Config(region_name=REGION, max_pool_connections=80, retries={"max_attempts": 5, "mode": "adaptive"})
-    return boto3.resource("dynamodb", config=cfg), boto3.client("dynamodb", config=cfg)
+    dynamodb = get_ddb_resource(REGION, max_pool_connections=80)
+    return dynamodb, dynamodb.meta.client
 
 
 def get_table_key_name(dynamodb_client, table_name):
@@ -58,19 +60,13 @@ def merge_items_to_final(dynamodb, items, final_table, nvd_key_name):
                 skipped += 1
                 return False
 
-            # Clean invalid/empty values
-            clean = {k: v for k, v in item.items() if v not in [None, "", "null", "None"]}
-            if not clean:
-                skipped += 1
-                return False
-
-            # Build update expression
+            # Build update expression, dropping key fields and invalid/empty values
             update_expr = []
             expr_attr_names = {}
             expr_attr_values = {}
 
-            for k, v in clean.items():
-                if k.lower() in ["id", "cve_id", "name"]:
+            for k, v in item.items():
+                if v is None or (isinstance(v, str) and v in NULL_STRINGS) or k.lower() in SKIP_KEYS:
                     continue
                 name_placeholder = f"#attr_{k}"
                 value_placeholder = f":val_{k}"
@@ -1,10 +1,210 @@
 # loaders/left_join_loader_cveindex.py
+import hashlib
+import json
 import logging
 import time
+import threading
 import concurrent.futures
+from itertools import chain, count, islice
 from boto3.dynamodb.conditions import Attr
-from utils.dynamo_helpers import parallel_scan
+from botocore.exceptions import ClientError
+from utils.dynamo_helpers import (
+    parallel_scan_iter, compile_update_builder, FastTypeSerializer, get_raw_client,
+)
 from utils.cve_utils import normalize_cve
+from utils.rate_limiter import get_write_limiter
+
+# DynamoDB caps a TransactWriteItems request at 100 actions; 25 keeps the
+# request payload small and a cancelled group cheap to replay.
+TRANSACT_GROUP_SIZE = 25
+
+# Update workers; each owns the CVEs whose hash falls in its bucket
+NUM_UPDATE_BUCKETS = 16
+
+# Per-record failures beyond this are only counted, then summarized once
+MAX_LOGGED_FAILURES = 5
+
+# Per-source content-hash attributes on final rows (content_hash_<source table>)
+HASH_ATTR_PREFIX = "content_hash_"
+
+# Records handed to a transform's vectorized `.batch` entry point per call
+BATCH_TRANSFORM_SIZE = 5000
+
+# Low-level AttributeValue encoder for the TransactWriteItems path; its output
+# only goes to the raw client from get_raw_client(), never to the resource
+_SERIALIZER = FastTypeSerializer()
+
+
+def _compile_row_writer(columns):
+    """
+    Update + condition expressions for one attribute layout.
+    The row is written when any contributing source's content hash is new or changed.
+    """
+    update_expression, expr_attr_names, build_values = compile_update_builder(columns)
+    _, _, build_serialized_values = compile_update_builder(columns, serialize=_SERIALIZER.serialize)
+    condition_expression = " OR ".join(
+        f"attribute_not_exists(#a{i}) OR #a{i} <> :v{i}"
+        for i, col in enumerate(columns)
+        if col.startswith(HASH_ATTR_PREFIX)
+    )
+    return update_expression, expr_attr_names, build_values, build_serialized_values, condition_expression
+
+
+def write_joined_rows(final_table, rows, log, label):
+    """
+    Apply joined attributes to the final table.
+    - rows: iterable of (cve_id, columns, values); `columns` is the attribute
+      layout to SET and `values` a tuple aligned with it.
+    - Rows are sharded by cve_id hash onto NUM_UPDATE_BUCKETS workers and sent
+      as TransactWriteItems groups; cancelled groups fall back to update_item.
+    - Returns (updated, unchanged, failed), summed from per-bucket tallies.
+    """
+    # Compile each distinct layout once, on this thread, before fanning out
+    writers = {}
+    buckets = [[] for _ in range(NUM_UPDATE_BUCKETS)]
+    for cve_id, columns, values in rows:
+        writer = writers.get(columns)
+        if writer is None:
+            writer = writers[columns] = _compile_row_writer(columns)
+        # Shard by cve_id hash: one worker drains each bucket, so every write
+        # for a given CVE is serialized on a single thread (no concurrent
+        # transactions racing on the same key) while buckets run in parallel.
+        buckets[hash(cve_id) % NUM_UPDATE_BUCKETS].append((cve_id, writer, values))
+
+    def group_bucket(bucket):
+        """Split a bucket into TransactWriteItems groups — a transaction may not
+        touch the same item twice, so a repeated CVE starts a new group."""
+        groups, group, group_keys = [], [], set()
+        for row in bucket:
+            if len(group) >= TRANSACT_GROUP_SIZE or row[0] in group_keys:
+                groups.append(group)
+                group, group_keys = [], set()
+            group.append(row)
+            group_keys.add(row[0])
+        if group:
+            groups.append(group)
+        return groups
+
+    # Raw client: TransactItems below are already AttributeValues, which the
+    # resource's client (final_table.meta.client) would serialize again
+    low_client = get_raw_client(final_table)
+    limiter = get_write_limiter()  # None unless WCU_LIMIT is set
+    # Shared across workers; next() on itertools.count is atomic under the GIL
+    log_slots = count()
+
+    # Each worker keeps its own tally = [updated, unchanged, failed], so no
+    # counter is shared between threads; write_joined_rows sums them at the end.
+    def report_failure(tally, n, msg, *args):
+        """Count failed CVEs; only the first few failures are logged so an error
+        storm (e.g. throttling) doesn't serialize the workers on the log handler."""
+        tally[2] += n
+        if next(log_slots) < MAX_LOGGED_FAILURES and log.isEnabledFor(logging.ERROR):
+            log.error(msg, *args)
+
+    def update_one(tally, cve_id, writer, values):
+        update_expression, expr_attr_names, build_values, _, condition_expression = writer
+        if limiter:
+            limiter.acquire()
+        try:
+            final_table.update_item(
+                Key={"cve_id": cve_id},
+                UpdateExpression=update_expression,
+                ConditionExpression=condition_expression,
+                ExpressionAttributeNames=expr_attr_names,
+                ExpressionAttributeValues=build_values(values),
+            )
+            tally[0] += 1
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                tally[1] += 1
+            else:
+                report_failure(tally, 1, "❌ Failed to update CVE %s: %s", cve_id, e)
+        except Exception as e:
+            report_failure(tally, 1, "❌ Failed to update CVE %s: %s", cve_id, e)
+
+    def transact(group):
+        if limiter:
+            limiter.acquire(2 * len(group))  # transactional writes cost 2 WCU per item
+        low_client.transact_write_items(TransactItems=[
+            {
+                "Update": {
+                    "TableName": final_table.name,
+                    "Key": {"cve_id": {"S": cve_id}},
+                    "UpdateExpression": writer[0],
+                    "ConditionExpression": writer[4],
+                    "ExpressionAttributeNames": writer[1],
+                    "ExpressionAttributeValues": writer[3](values),
+                }
+            }
+            for cve_id, writer, values in group
+        ])
+
+    def process(tally, group):
+        # An unchanged row fails its condition and cancels the whole transaction;
+        # drop those rows (per CancellationReasons) and resubmit the rest once.
+        for _ in range(2):
+            if not group:
+                return
+            try:
+                transact(group)
+                tally[0] += len(group)
+                return
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "TransactionCanceledException":
+                    report_failure(tally, len(group), "❌ Transaction failed for %d CVEs: %s", len(group), e)
+                    return
+                reasons = [r.get("Code") for r in e.response.get("CancellationReasons", [])]
+                log.debug("Transaction cancelled (%s) for %d CVEs", reasons, len(group))
+                if len(reasons) != len(group):
+                    break
+                remaining = [row for row, code in zip(group, reasons) if code != "ConditionalCheckFailed"]
+                tally[1] += len(group) - len(remaining)
+                if len(remaining) == len(group):
+                    break  # cancelled for another reason (conflict, throttling)
+                group = remaining
+            except Exception as e:
+                report_failure(tally, len(group), "❌ Transaction failed for %d CVEs: %s", len(group), e)
+                return
+
+        # A cancelled transaction applies nothing, so replay what's left one by one
+        for row in group:
+            update_one(tally, *row)
+
+    def drain(bucket):
+        tally = [0, 0, 0]
+        for group in group_bucket(bucket):
+            process(tally, group)
+        return tally
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_UPDATE_BUCKETS) as ex:
+        tallies = list(ex.map(drain, [b for b in buckets if b]))
+    updated, unchanged, failed = map(sum, zip((0, 0, 0), *tallies))
+
+    if failed:
+        log.error(f"❌ {failed} CVE updates failed for {label} (at most {MAX_LOGGED_FAILURES} logged above)")
+    return updated, unchanged, failed
+
+
+def flush_coalesced_updates(final_table, pending, log=None):
+    """
+    Write the per-CVE attributes collected by left joins run with `pending`:
+    one update per CVE covering every source, instead of one per source.
+    - Returns (updated, unchanged, failed); callers must not advance source
+      watermarks when failed > 0, or the failed rows are never retried.
+    """
+    log = log or logging.getLogger("left-join-cveindex")
+    if not pending:
+        log.info("ℹ️ No coalesced left-join updates to write")
+        return 0, 0, 0
+
+    start = time.time()
+    log.info(f"✍️ Writing coalesced left-join updates for {len(pending)} CVEs ...")
+    rows = ((cve_id, tuple(entry), tuple(entry.values())) for cve_id, entry in pending.items())
+    updated, unchanged, failed = write_joined_rows(final_table, rows, log, "coalesced sources")
+    log.info(
+        f"✅ Coalesced write complete: updated {updated}, unchanged {unchanged}, failed {failed}, duration={time.time()-start:.2f}s"
+    )
+    return updated, unchanged, failed
 
 
 def left_join_source_from_cveindex(
@@ -19,6 +219,8 @@ def left_join_source_from_cveindex(
     is_static: bool = False,
     log=None,
     total_segments: int = 8,
+    cve_set=None,
+    pending=None,
 ):
     """
     Left-join a source (APTfinal, AttackerKB, etc.) onto final table
@@ -37,6 +239,11 @@ def left_join_source_from_cveindex(
         is_static: True if the source is static (no uploaded_date)
         log: Logger
         total_segments: Parallel scan segments
+        cve_set: Pre-loaded CVE IDs from the index (skips the index scan when given)
+        pending: Optional {cve_id: {attr: value}} shared across sources. When given,
+            joined attributes are merged into it instead of written, and the
+            uploaded_date watermark is returned (not stored) — the caller writes
+            everything once via flush_coalesced_updates() and then stores it.
     """
     log = log or logging.getLogger("left-join-cveindex")
 
@@ -46,96 +253,136 @@ def left_join_source_from_cveindex(
     cveindex_table = dynamodb.Table(cveindex_table_name)
 
     # ==========================================================
-    # Step 1 — Load CVE set from CVE index
-    # ==========================================================
-    log.info(f"📥 Scanning CVE index table '{cveindex_table_name}' to collect CVEs ...")
-    cve_items = parallel_scan(cveindex_table, log=log, total_segments=total_segments)
-    cve_set = {normalize_cve(i.get("cve_id")) for i in cve_items if i.get("cve_id")}
-    log.info(f"✅ Loaded {len(cve_set)} CVEs from index table.")
-
-    # ==========================================================
-    # Step 2 — Scan source table (static/dynamic)
+    # Step 1 — Load CVE set from CVE index (reuse caller's set if provided)
+    # on a background thread while the source table is streamed below.
     # ==========================================================
     last_sync = get_last_sync_fn(source_table_name)
     if is_static:
         log.info(f"⚙️ Static dataset detected — performing full scan for {source_table_name}")
-        items = parallel_scan(source_table, log=log, total_segments=total_segments)
+        source_filter = None
     else:
         log.info(f"🔍 Incremental scan: uploaded_date > {last_sync}")
-        items = parallel_scan(
-            source_table,
-            log=log,
-            filter_expr=Attr("uploaded_date").gt(last_sync),
-            total_segments=total_segments
-        )
+        source_filter = Attr("uploaded_date").gt(last_sync)
 
-    if not items:
-        log.warning(f"⚠️ No records found in {source_table_name}")
-        return
+    abandon_index = threading.Event()  # set on an early return: stop the index scan, don't wait it out
 
-    log.info(f"📦 Found {len(items)} records in {source_table_name}")
+    def load_index_cves():
+        cves = set()
+        index_scan = parallel_scan_iter(cveindex_table, log=log, total_segments=total_segments, projection=["cve_id"])
+        try:
+            for item in index_scan:
+                if abandon_index.is_set():
+                    return None
+                cve = item.get("cve_id")
+                if cve:
+                    cves.add(normalize_cve(cve))
+        finally:
+            index_scan.close()  # stops the segment workers when abandoned
+        return cves
 
-    # ==========================================================
-    # Step 3 — Parallel join for matching CVEs
-    # ==========================================================
-    updated, skipped = 0, 0
-    start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
+        fut_index = None
+        if cve_set is None:
+            log.info(f"📥 Scanning CVE index table '{cveindex_table_name}' to collect CVEs ...")
+            fut_index = ex.submit(load_index_cves)
+        else:
+            log.info(f"♻️ Reusing {len(cve_set)} pre-loaded CVEs from index table.")
 
-    def process(rec):
-        nonlocal updated, skipped
-        raw_cve = rec.get("cve_id") or rec.get(source_join_key) or rec.get("CVE") or rec.get("cveID") or rec.get("CVE_ID")
-        cve_id = normalize_cve(raw_cve)
-        if not cve_id or cve_id not in cve_set:
-            skipped += 1
-            return False
-
-        transformed = transform_fn(rec)
-        if not transformed:
-            skipped += 1
-            return False
-
-        transformed.pop("uploaded_date", None)
-        expr_attr_values, expr_attr_names = {}, {}
-        update_expr = []
-
-        for k, v in transformed.items():
-            if k == "cve_id":
-                continue
-            name_placeholder = f"#attr_{k}"
-            val_placeholder = f":val_{k}"
-            expr_attr_names[name_placeholder] = k
-            expr_attr_values[val_placeholder] = v
-            update_expr.append(f"{name_placeholder} = {val_placeholder}")
+        scan = parallel_scan_iter(source_table, log=log, filter_expr=source_filter, total_segments=total_segments)
+        first = next(scan, None)
+        if first is None:
+            log.warning(f"⚠️ No records found in {source_table_name}")
+            abandon_index.set()
+            return
 
-        if not update_expr:
-            skipped += 1
-            return False
+        # ==========================================================
+        # Resolve output schema once — transforms declare it via `.columns`,
+        # so the update expression and attribute names are built a single time.
+        # ==========================================================
+        final_columns = getattr(transform_fn, "columns", None)
+        if final_columns is None:
+            final_columns = tuple((transform_fn(first) or {}).keys())
 
-        try:
-            final_table.update_item(
-                Key={"cve_id": cve_id},
-                UpdateExpression="SET " + ", ".join(update_expr),
-                ExpressionAttributeNames=expr_attr_names,
-                ExpressionAttributeValues=expr_attr_values,
+        set_columns = [c for c in final_columns if c not in ("cve_id", "uploaded_date")]
+        if not set_columns:
+            log.warning(f"⚠️ Transform for {source_table_name} declares no attributes to join")
+            abandon_index.set()
+            scan.close()
+            return
+
+        # ==========================================================
+        # Step 2 — Transform while scanning: items are consumed page by page as
+        # the segment workers fetch them, so DynamoDB latency overlaps the
+        # CPU-bound transforms. Raw items are dropped once transformed; only
+        # (cve_id, values) candidates are kept until the CVE index is ready.
+        # Each transform owns its CVE aliases, so its cve_id is authoritative;
+        # the source join key is only probed when the transform found none.
+        # ==========================================================
+        # Transforms exposing a vectorized `.batch` entry point (e.g. EPSS) get
+        # the stream in chunks of BATCH_TRANSFORM_SIZE instead of one call per record.
+        # ==========================================================
+        start = time.time()
+        total = 0
+        max_uploaded = ""
+        candidates = []
+        batch_fn = getattr(transform_fn, "batch", None)
+        records = chain((first,), scan)
+        if batch_fn is None:
+            pairs = ((rec, transform_fn(rec)) for rec in records)
+        else:
+            pairs = (
+                pair
+                for chunk in iter(lambda: list(islice(records, BATCH_TRANSFORM_SIZE)), [])
+                for pair in zip(chunk, batch_fn(chunk))
             )
-            updated += 1
-            return True
-        except Exception as e:
-            log.error(f"❌ Failed to update CVE {cve_id}: {e}")
-            return False
+        for rec, transformed in pairs:
+            total += 1
+            if not is_static:
+                max_uploaded = max(max_uploaded, rec.get("uploaded_date", ""))
+            if not transformed:
+                continue
+            cve_id = normalize_cve(transformed.get("cve_id") or rec.get(source_join_key))
+            if cve_id:
+                candidates.append((cve_id, tuple(map(transformed.get, set_columns))))
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as ex:
-        list(ex.map(process, items))
+        if fut_index is not None:
+            cve_set = fut_index.result()
+            log.info(f"✅ Loaded {len(cve_set)} CVEs from index table.")
 
-    log.info(
-        f"✅ Left join complete for {source_table_name}: updated {updated}, skipped {skipped}, duration={time.time()-start:.2f}s"
-    )
+    log.info(f"📦 Found {total} records in {source_table_name}")
+
+    # Each source keeps its own content hash on the row, so unchanged records
+    # are rejected server-side instead of being rewritten every run.
+    hash_attr = f"{HASH_ATTR_PREFIX}{source_table_name}"
+    layout = (*set_columns, hash_attr)
+
+    def content_hash(values):
+        payload = json.dumps(dict(zip(set_columns, values)), sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+    # ==========================================================
+    # Step 3 — Join: keep candidates present in the CVE index. Matched rows
+    # are plain tuples aligned with `layout` (not the transform's dict).
+    # ==========================================================
+    rows = [(cve_id, layout, (*values, content_hash(values))) for cve_id, values in candidates if cve_id in cve_set]
+    skipped = total - len(rows)
+    log.info(f"🎯 {len(rows)} of {total} {source_table_name} records match the CVE index")
+
+    if pending is not None:
+        for cve_id, _, values in rows:
+            pending.setdefault(cve_id, {}).update(zip(layout, values))
+        log.info(f"🧺 Queued {len(rows)} {source_table_name} rows for the coalesced write ({len(pending)} CVEs pending)")
+    else:
+        updated, unchanged, _ = write_joined_rows(final_table, rows, log, source_table_name)
+        log.info(
+            f"✅ Left join complete for {source_table_name}: updated {updated}, unchanged {unchanged}, skipped {skipped}, duration={time.time()-start:.2f}s"
+        )
 
     # ==========================================================
     # Step 4 — Metadata update for dynamic sources
     # ==========================================================
     if not is_static:
-        max_uploaded = max((rec.get("uploaded_date", "") for rec in items), default=None)
-        if max_uploaded:
+        if max_uploaded and pending is None:
             set_last_sync_fn(source_table_name, max_uploaded)
             log.info(f"🕒 Stored max(uploaded_date) = {max_uploaded} for {source_table_name}")
+        return max_uploaded
@@ -1,8 +1,10 @@
 # loaders/nvd_loader.py
 import logging
+from itertools import islice
 from boto3.dynamodb.conditions import Attr
 from utils.time_utils import iso_now
-from utils.dynamo_helpers import parallel_scan, get_max_uploaded_date
+from utils.dynamo_helpers import parallel_scan_iter, get_max_uploaded_date
+from utils.rate_limiter import get_write_limiter
 from config import CVE_PATTERN
 
 
@@ -18,8 +20,8 @@ def load_nvd_base(
     """
     Incrementally load NVD base data into the final table.
     - Reads last_sync from metadata table.
-    - Scans only new records since last_sync (based on date_updated).
-    - Updates metadata with max(date_updated) from NVD table.
+    - Streams only new records since last_sync (based on date_updated) straight into the batch writer.
+    - Updates metadata with max(date_updated), tracked incrementally while writing.
     """
     log = logging.getLogger("vuln-sync")
     nvd_table = dynamodb.Table(nvd_table_name)
@@ -28,38 +30,46 @@ def load_nvd_base(
     last_sync = get_last_sync_fn(nvd_table_name)
     log.info(f" Last sync time for {nvd_table_name}: {last_sync}")
 
-    # Step 2️ — Scan new/updated items (date_updated-based)
+    # Step 2️ — Stream new/updated items (date_updated-based)
     log.info(f" Scanning {nvd_table_name} for records with date_updated > {last_sync}...")
-    new_items = parallel_scan(
+    scan_items = parallel_scan_iter(
         nvd_table,
         log=log,
         filter_expr=Attr("date_updated").gt(last_sync)
     )
+    new_items = scan_items
 
     if limit:
-        new_items = new_items[:limit]
+        new_items = islice(scan_items, limit)
         log.info(f" Testing mode — limiting to {limit} NVD items")
 
-    if not new_items:
-        log.info(" No new or updated NVD records found. Skipping load.")
-        return set()
-
-    log.info(f" Found {len(new_items)} new or updated NVD records.")
-
-    # Step 3️ — Write to final table
+    # Step 3️ — Write to final table while the scan is still running
     cve_ids = set()
+    scanned = 0
     written = 0
+    max_date = None
+    now = iso_now()  # one uploaded_date for every row written in this run
+    limiter = get_write_limiter()  # None unless WCU_LIMIT is set
 
-    with final_table.batch_writer() as batch:
+    # overwrite_by_pkeys: a CVE re-emitted in the same flush window (e.g. NVD
+    # reanalysis) is collapsed to its latest put instead of costing a second WCU.
+    with final_table.batch_writer(overwrite_by_pkeys=["cve_id"]) as batch:
         for rec in new_items:
+            scanned += 1
+            date_updated = rec.get("date_updated")
+            if date_updated and (max_date is None or date_updated > max_date):
+                max_date = date_updated
+
             cve = rec.get("id") or rec.get("cveID") or rec.get("CVE_ID")
             if not cve or not CVE_PATTERN.match(cve):
                 continue
 
-            transformed = transform_fn(rec)
+            transformed = transform_fn(rec, uploaded_date=now)
             transformed["cve_id"] = transformed.get("cve_id") or cve
-            transformed.setdefault("uploaded_date", rec.get("date_updated", iso_now()))
+            transformed.setdefault("uploaded_date", rec.get("date_updated", now))
 
+            if limiter:
+                limiter.acquire()
             batch.put_item(Item=transformed)
             cve_ids.add(transformed["cve_id"])
             written += 1
@@ -67,10 +77,18 @@ def load_nvd_base(
             if written % 1000 == 0:
                 log.info(f" Written {written} NVD base rows")
 
+    scan_items.close()  # stop segment workers early when running with a limit
+
+    if not scanned:
+        log.info(" No new or updated NVD records found. Skipping load.")
+        return set()
+
+    log.info(f" Found {scanned} new or updated NVD records.")
     log.info(f" NVD base load complete: {written} new records written.")
 
-    # Step 4️ — Compute max(date_updated)
-    max_date = get_max_uploaded_date(dynamodb, nvd_table_name, log)
+    # Step 4️ — Persist max(date_updated) seen during the scan
+    if not max_date:
+        max_date = get_max_uploaded_date(dynamodb, nvd_table_name, log)
     set_last_sync_fn(nvd_table_name, max_date)
     log.info(f" Stored max(date_updated) = {max_date} for {nvd_table_name}")
 
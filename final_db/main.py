@@ -8,21 +8,22 @@ Phases:
 3️⃣ Left-join other data sources → using CVE Index (faster than full scans)
 """
 
-import boto3
-from botocore.config import Config
-
 from config import (
     REGION,
     NVD_TABLE,
     FINAL_TABLE,
     METADATA_TABLE,
+    CVE_INDEX_TABLE,
+    DAX_ENDPOINT,
+    COALESCE_SOURCE_WRITES,
     SOURCE_SPECS,
 )
 from transformations import nvd_transform
 from utils.logging_utils import setup_logging
-from utils.dynamo_helpers import get_last_sync, set_last_sync, get_all_cve_ids
+from utils.dynamo_helpers import get_ddb_resource, get_last_sync, set_last_sync, get_all_cve_ids
+from utils.cve_utils import normalize_cve
 from loaders.nvd_loader import load_nvd_base
-from loaders.left_join_loader import left_join_source_from_cveindex
+from loaders.left_join_loader import left_join_source_from_cveindex, flush_coalesced_updates
 
 
 def run_pipeline(test_limit: int | None = None):
@@ -32,15 +33,18 @@ def run_pipeline(test_limit: int | None = None):
     # ==========================================================
     # DynamoDB setup
     # ==========================================================
-    config = Config(
-        region_name=REGION,
-        max_pool_connections=50,
-        retries={"max_attempts": 5, "mode": "adaptive"},
-    )
-    dynamodb = boto3.resource("dynamodb", config=config)
+    dynamodb = get_ddb_resource(REGION)
     final_table = dynamodb.Table(FINAL_TABLE)
     metadata_table = dynamodb.Table(METADATA_TABLE)
 
+    # Read-only path for CVE index lookups — served from DAX when configured.
+    # Writes never go through DAX to avoid item-cache inconsistency.
+    lookup_dynamodb = dynamodb
+    if DAX_ENDPOINT:
+        import amazondax
+        lookup_dynamodb = amazondax.AmazonDaxClient.resource(endpoint_url=DAX_ENDPOINT, region_name=REGION)
+        log.info(f"⚡ Routing CVE index reads through DAX: {DAX_ENDPOINT}")
+
     # ==========================================================
     # Phase A — Load NVD base dataset into final table
     # ==========================================================
@@ -60,17 +64,25 @@ def run_pipeline(test_limit: int | None = None):
     # Phase B — Fetch all existing CVE IDs from CVE index table
     # ==========================================================
     log.info("🔍 Fetching all CVE IDs from CVE Index table for left joins...")
-    cve_index_table = "infoservices-cybersecurity-vuln-cveindex"
-    final_cve_set = get_all_cve_ids(dynamodb, cve_index_table, log)
+    cve_index_table = CVE_INDEX_TABLE
+    # Normalized once here and shared by every left join below, so the index
+    # table is scanned a single time per run instead of once per source.
+    final_cve_set = {normalize_cve(c) for c in get_all_cve_ids(lookup_dynamodb, cve_index_table, log)}
+    final_cve_set.discard(None)
     log.info(f"✅ Loaded {len(final_cve_set)} CVE IDs from CVE index table.")
 
     # ==========================================================
     # Phase C — Left join all other data sources using CVE Index
     # ==========================================================
+    # When coalescing, sources only collect {cve_id: attrs}; the final table is
+    # written once per CVE after the loop, then the watermarks are stored.
+    pending = {} if COALESCE_SOURCE_WRITES else None
+    watermarks = []
+
     for table_name, join_key, transform, is_static in SOURCE_SPECS:
         log.info(f"🔄 Starting left join for {table_name} (static={is_static})")
 
-        left_join_source_from_cveindex(
+        max_uploaded = left_join_source_from_cveindex(
             dynamodb=dynamodb,
             final_table=final_table,
             cveindex_table_name=cve_index_table,   # ✅ Using CVE index table
@@ -81,7 +93,22 @@ def run_pipeline(test_limit: int | None = None):
             set_last_sync_fn=lambda t, ts: set_last_sync(metadata_table, t, ts),
             is_static=is_static,                   # ✅ handle static vs dynamic
             log=log,
+            cve_set=final_cve_set,                 # ✅ shared CVE index snapshot
+            pending=pending,                       # ✅ coalesce writes across sources
         )
+        if pending is not None and max_uploaded:
+            watermarks.append((table_name, max_uploaded))
+
+    if pending is not None:
+        _, _, failed = flush_coalesced_updates(final_table, pending, log)
+        if failed:
+            # Keep the old watermarks so the next run rescans and retries these rows
+            raise RuntimeError(
+                f"{failed} coalesced CVE updates failed; not storing uploaded_date watermarks for {len(watermarks)} source(s)"
+            )
+        for table_name, max_uploaded in watermarks:
+            set_last_sync(metadata_table, table_name, max_uploaded)
+            log.info(f"🕒 Stored max(uploaded_date) = {max_uploaded} for {table_name}")
 
     log.info("🏁 ✅ All sources left-joined successfully via CVE Index.")
 
@@ -0,0 +1,107 @@
+# tests/test_create_cve_index.py
+import logging
+import threading
+import unittest
+from unittest import mock
+
+from tools import create_cve_index
+
+
+class _Paginator:
+    def __init__(self, items):
+        self.items = items
+
+    def paginate(self, **params):
+        # every item lands in segment 0; the other segments come back empty
+        yield {"Items": self.items if params.get("Segment", 0) == 0 else []}
+
+
+class _Writer:
+    """Fake batch_writer; `fail_on` is "put" or "flush" to make this writer fail there."""
+
+    def __init__(self, fail_on=None, gate=None):
+        self.fail_on = fail_on
+        self.gate = gate
+        self.attempts = 0
+        self.items = []
+
+    def __enter__(self):
+        if self.gate is not None and self.fail_on is None:
+            self.gate.wait(5)  # healthy writers start only once the failing one has failed
+        return self
+
+    def __exit__(self, *exc):
+        if self.fail_on == "flush":
+            raise RuntimeError("flush failed")
+
+    def put_item(self, Item):
+        self.attempts += 1
+        if self.fail_on == "put":
+            if self.gate is not None:
+                self.gate.set()
+            raise RuntimeError("put failed")
+        self.items.append(Item)
+
+
+class _Table:
+    def __init__(self, name, items, fail_on=(), gate=None):
+        self.name = name
+        self.meta = mock.MagicMock()
+        self.meta.client.get_paginator.return_value = _Paginator(items)
+        self.fail_on = list(fail_on)  # per writer, in creation order
+        self.writers = []
+        self.gate = gate
+        self.lock = threading.Lock()
+
+    def batch_writer(self, **kwargs):
+        with self.lock:
+            writer = _Writer(self.fail_on.pop(0) if self.fail_on else None, self.gate)
+            self.writers.append(writer)
+        return writer
+
+
+class SyncCveIdsWriterFailureTest(unittest.TestCase):
+    def _sync(self, fail_on, gate=None):
+        final = _Table(create_cve_index.FINAL_TABLE, [{"cve_id": f"CVE-2024-{i:04d}"} for i in range(50)])
+        index = _Table(create_cve_index.CVE_INDEX_TABLE, [], fail_on, gate)
+        dynamodb = mock.MagicMock()
+        dynamodb.Table.side_effect = {final.name: final, index.name: index}.__getitem__
+        log = logging.getLogger("test")
+        outcome = {}
+
+        def run():
+            try:
+                create_cve_index.sync_cve_ids(dynamodb, log)
+            except Exception as e:
+                outcome["error"] = e
+
+        with mock.patch.object(create_cve_index, "EXPORT_BUCKET", None), \
+                mock.patch.object(create_cve_index, "get_write_limiter", return_value=None), \
+                mock.patch.object(log, "error") as error:
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            worker.join(timeout=10)
+
+        self.assertFalse(worker.is_alive(), "sync_cve_ids hung after a failed batch_writer")
+        return index, outcome.get("error"), [c.args[0] for c in error.call_args_list]
+
+    def test_failed_final_flush_does_not_hang_and_is_reported(self):
+        fail_on = ["flush"] * create_cve_index.INDEX_WRITERS
+        index, error, logged = self._sync(fail_on)
+
+        self.assertEqual(sum(len(w.items) for w in index.writers), 50)
+        self.assertIsInstance(error, RuntimeError)
+        self.assertIn("50 of 50 new CVEs were not written", logged[-1])
+
+    def test_healthy_writers_take_over_a_failed_writers_queue(self):
+        index, error, logged = self._sync(["put"], threading.Event())
+
+        failed_writer = index.writers[0]
+        written = sum(len(w.items) for w in index.writers[1:])
+        # only the item the failed writer held is lost; the rest went to healthy writers
+        self.assertEqual((failed_writer.attempts, written), (1, 49))
+        self.assertIsInstance(error, RuntimeError)
+        self.assertIn("1 of 50 new CVEs were not written", logged[-1])
+
+if __name__ == "__main__":
+    unittest.main()
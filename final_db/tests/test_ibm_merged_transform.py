@@ -0,0 +1,33 @@
+# tests/test_ibm_merged_transform.py
+import importlib.util
+import unittest
+
+from transformations.static_data import ibm_merged_transform
+
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+
+# CVE_ID outranks lowercase cve, whatever order the record lists them in
+RECORDS = [
+    {"cve": "CVE-2020-0001", "CVE_ID": "CVE-2021-0002", "Attack_Vector": "Network"},
+    {"CVE_ID": "CVE-2021-0002", "cve": "CVE-2020-0001", "Attack_Vector": "Network"},
+    {"cve_id": "CVE-2020-0001", "CVE": "null", "cve": "CVE-2021-0002", "Attack_Vector": "Network"},
+]
+
+
+class IbmCveAliasOrderTest(unittest.TestCase):
+    def test_row_path_probes_raw_headers_in_priority_order(self):
+        for record in RECORDS:
+            out = ibm_merged_transform.clean_and_rename(record)
+            self.assertEqual(out["cve_id"], "CVE-2021-0002", record)
+            self.assertEqual(out["ibm_attack_vector"], "Network")
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas not installed")
+    def test_frame_path_matches_row_path(self):
+        import pandas as pd
+
+        frame = ibm_merged_transform.clean_and_rename_frame(pd.DataFrame.from_records(RECORDS))
+        self.assertEqual(frame["cve_id"].tolist(), ["CVE-2021-0002"] * len(RECORDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
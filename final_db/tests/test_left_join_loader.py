@@ -0,0 +1,179 @@
+# tests/test_left_join_loader.py
+import logging
+import threading
+import time
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from loaders import left_join_loader
+from transformations import epss_transform
+from utils import dynamo_helpers
+
+
+class WriteJoinedRowsTransactTest(unittest.TestCase):
+    """TransactWriteItems must carry wire-format AttributeValues to a raw client."""
+
+    def setUp(self):
+        self.final_table = mock.MagicMock()
+        self.final_table.name = "final"
+        self.raw_client = mock.MagicMock()
+        patcher = mock.patch.object(left_join_loader, "get_raw_client", return_value=self.raw_client)
+        self.get_raw_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        env = mock.patch.dict("os.environ", {"WCU_LIMIT": ""})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_transact_items_shape(self):
+        columns = ("vendor", "notes", "content_hash_src")
+        rows = [("CVE-2024-0001", columns, ("acme", None, "abc123"))]
+
+        updated, unchanged, failed = left_join_loader.write_joined_rows(
+            self.final_table, rows, logging.getLogger("test"), "src"
+        )
+
+        self.assertEqual((updated, unchanged, failed), (1, 0, 0))
+        self.get_raw_client.assert_called_once_with(self.final_table)
+        self.raw_client.transact_write_items.assert_called_once_with(TransactItems=[
+            {
+                "Update": {
+                    "TableName": "final",
+                    "Key": {"cve_id": {"S": "CVE-2024-0001"}},
+                    "UpdateExpression": "SET #a0 = :v0, #a1 = :v1, #a2 = :v2",
+                    "ConditionExpression": "attribute_not_exists(#a2) OR #a2 <> :v2",
+                    "ExpressionAttributeNames": {"#a0": "vendor", "#a1": "notes", "#a2": "content_hash_src"},
+                    "ExpressionAttributeValues": {
+                        ":v0": {"S": "acme"},
+                        ":v1": {"NULL": True},
+                        ":v2": {"S": "abc123"},
+                    },
+                }
+            }
+        ])
+        # the resource's client would serialize the AttributeValues a second time
+        self.final_table.meta.client.transact_write_items.assert_not_called()
+
+    def test_tallies_add_up_across_buckets(self):
+        columns = ("vendor", "content_hash_src")
+        rows = [(f"CVE-2024-{i:04d}", columns, ("acme", str(i))) for i in range(400)]
+        lock = threading.Lock()
+        failed_sizes = []
+
+        def transact_write_items(TransactItems):
+            with lock:
+                fail = len(failed_sizes) % 2 == 0 and len(TransactItems) > 1
+                if fail:
+                    failed_sizes.append(len(TransactItems))
+                else:
+                    failed_sizes.append(0)
+            if fail:
+                raise ClientError({"Error": {"Code": "InternalServerError", "Message": "boom"}}, "TransactWriteItems")
+
+        self.raw_client.transact_write_items.side_effect = transact_write_items
+        log = logging.getLogger("test")
+        with mock.patch.object(log, "error") as error:
+            updated, unchanged, failed = left_join_loader.write_joined_rows(self.final_table, rows, log, "src")
+
+        self.assertEqual(failed, sum(failed_sizes))
+        self.assertGreater(failed, 0)
+        self.assertEqual((updated + failed, unchanged), (400, 0))
+        # per-group errors are capped, plus one summary line
+        self.assertLessEqual(error.call_count, left_join_loader.MAX_LOGGED_FAILURES + 1)
+
+
+class IndexScanTest(unittest.TestCase):
+    def test_empty_source_does_not_wait_for_the_index_scan(self):
+        index_calls = []
+
+        def endless_index():
+            while True:
+                time.sleep(0.01)
+                yield {"cve_id": "CVE-2024-0001"}
+
+        def scan_iter(table, **kwargs):
+            if table is index_table:
+                index_calls.append(kwargs)
+                return endless_index()
+            return iter([])
+
+        index_table, source_table = mock.MagicMock(), mock.MagicMock()
+        dynamodb = mock.MagicMock()
+        dynamodb.Table.side_effect = {"index": index_table, "src": source_table}.__getitem__
+
+        start = time.time()
+        with mock.patch.object(left_join_loader, "parallel_scan_iter", side_effect=scan_iter):
+            result = left_join_loader.left_join_source_from_cveindex(
+                dynamodb, mock.MagicMock(), "index", "src", "cve", mock.MagicMock(columns=("cve_id", "x")),
+                get_last_sync_fn=lambda name: "", set_last_sync_fn=mock.MagicMock(),
+                is_static=True, log=logging.getLogger("test"),
+            )
+
+        self.assertIsNone(result)
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(index_calls[0]["projection"], ["cve_id"])
+
+
+class GetRawClientTest(unittest.TestCase):
+    def test_mirrors_resource_client_settings(self):
+        table = mock.MagicMock()
+        meta = table.meta.client.meta
+        with mock.patch.object(dynamo_helpers.boto3, "client") as client:
+            raw = dynamo_helpers.get_raw_client(table)
+
+        client.assert_called_once_with(
+            "dynamodb",
+            region_name=meta.region_name,
+            endpoint_url=meta.endpoint_url,
+            config=meta.config,
+        )
+        self.assertIs(raw, client.return_value)
+
+
+class BatchTransformTest(unittest.TestCase):
+    """Transforms with a `.batch` entry point are fed scan chunks, not single records."""
+
+    RECORDS = [
+        {"cve": " CVE-2024-0001 ", "epss": "0.5", "percentile": "0.9"},
+        {"cve": "CVE-2024-0002", "epss": "bad", "percentile": None},
+        {"cve": "CVE-2024-0003", "epss": "0.1", "percentile": "0.2"},
+    ]
+
+    def _join(self, transform_fn):
+        pending = {}
+        with mock.patch.object(left_join_loader, "parallel_scan_iter", return_value=iter(self.RECORDS)), \
+                mock.patch.object(left_join_loader, "BATCH_TRANSFORM_SIZE", 2):
+            left_join_loader.left_join_source_from_cveindex(
+                mock.MagicMock(), mock.MagicMock(), "index", "epss", "cve", transform_fn,
+                get_last_sync_fn=lambda name: "", set_last_sync_fn=mock.MagicMock(),
+                is_static=True, log=logging.getLogger("test"),
+                cve_set={"CVE-2024-0001", "CVE-2024-0002"}, pending=pending,
+            )
+        return pending
+
+    def test_epss_uses_batch_entry_point(self):
+        transform_fn = mock.MagicMock(
+            columns=epss_transform.clean_and_rename.columns,
+            batch=mock.MagicMock(wraps=epss_transform.transform_epss_records),
+        )
+
+        pending = self._join(transform_fn)
+
+        transform_fn.assert_not_called()
+        self.assertEqual([len(c.args[0]) for c in transform_fn.batch.call_args_list], [2, 1])
+        self.assertEqual(sorted(pending), ["CVE-2024-0001", "CVE-2024-0002"])
+
+    def test_batch_matches_per_record_transform(self):
+        per_record = mock.MagicMock(wraps=epss_transform.clean_and_rename, columns=("cve_id", "epss_value", "epss_percentile"))
+        del per_record.batch
+
+        expected = self._join(per_record)
+        actual = self._join(epss_transform.clean_and_rename)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual["CVE-2024-0002"]["epss_value"], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_main.py
+import unittest
+from unittest import mock
+
+import main
+
+
+class CoalescedWatermarkTest(unittest.TestCase):
+    """Source watermarks only advance once every coalesced update was written."""
+
+    def _run(self, flush_result):
+        def left_join(**kwargs):
+            kwargs["pending"]["CVE-2024-0001"] = {"epss_value": 1}
+            return "2025-01-01"
+
+        with mock.patch.multiple(
+            main,
+            setup_logging=mock.DEFAULT,
+            get_ddb_resource=mock.DEFAULT,
+            load_nvd_base=mock.MagicMock(return_value=set()),
+            get_all_cve_ids=mock.MagicMock(return_value=["CVE-2024-0001"]),
+            left_join_source_from_cveindex=mock.MagicMock(side_effect=left_join),
+            flush_coalesced_updates=mock.MagicMock(return_value=flush_result),
+            set_last_sync=mock.DEFAULT,
+            SOURCE_SPECS=[("src", "cve", mock.MagicMock(), False)],
+            COALESCE_SOURCE_WRITES=True,
+            DAX_ENDPOINT=None,
+        ) as patched:
+            try:
+                main.run_pipeline()
+            finally:
+                self.set_last_sync = patched["set_last_sync"]
+
+    def test_watermarks_stored_after_clean_flush(self):
+        self._run((1, 0, 0))
+        self.set_last_sync.assert_called_once_with(mock.ANY, "src", "2025-01-01")
+
+    def test_failed_updates_keep_old_watermarks(self):
+        with self.assertRaises(RuntimeError):
+            self._run((0, 0, 1))
+        self.set_last_sync.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
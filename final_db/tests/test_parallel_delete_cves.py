@@ -0,0 +1,60 @@
+# tests/test_parallel_delete_cves.py
+import importlib
+import sys
+import threading
+import unittest
+from unittest import mock
+
+
+class _Writer:
+    """batch_writer whose final flush fails, after every delete was buffered."""
+
+    def __init__(self):
+        self.keys = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        raise RuntimeError("flush failed")
+
+    def delete_item(self, Key):
+        self.keys.append(Key)
+
+
+class ParallelDeleteFailureTest(unittest.TestCase):
+    def test_failed_flush_is_reported_and_fails_the_run(self):
+        final = mock.MagicMock()
+        final.batch_writer.side_effect = lambda **kwargs: _Writer()
+        dynamodb = mock.MagicMock()
+        dynamodb.Table.side_effect = lambda name: final if name.endswith("final-data") else mock.MagicMock(name=name)
+        sources = {
+            "Name": [{"Name": f"CVE-2024-{i:04d}"} for i in range(30)],
+            "CVE_ID": [{"CVE_ID": f"CVE-2023-{i:04d}"} for i in range(20)],
+        }
+        outcome = {}
+
+        def run():
+            sys.modules.pop("tools.parallel_delete_cves", None)
+            try:
+                importlib.import_module("tools.parallel_delete_cves")
+            except Exception as e:
+                outcome["error"] = e
+
+        with mock.patch("utils.dynamo_helpers.get_ddb_resource", return_value=dynamodb), \
+                mock.patch("utils.dynamo_helpers.parallel_scan_iter",
+                           side_effect=lambda table, projection, **kw: iter(sources[projection[0]])), \
+                mock.patch("utils.rate_limiter.get_write_limiter", return_value=None), \
+                mock.patch("logging.basicConfig"), \
+                mock.patch("logging.Logger.error") as error:
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            worker.join(timeout=10)
+
+        self.assertFalse(worker.is_alive(), "parallel delete hung after a failed flush")
+        self.assertIsInstance(outcome.get("error"), RuntimeError)
+        self.assertIn("50 CVE deletes failed", error.call_args_list[-1].args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
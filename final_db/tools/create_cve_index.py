@@ -1,23 +1,26 @@
-import boto3
+import os
 import logging
+import queue
 import concurrent.futures
-from botocore.config import Config
 from boto3.dynamodb.conditions import Attr
-from utils.dynamo_helpers import parallel_scan
+from utils.dynamo_helpers import get_ddb_resource, parallel_scan_iter, iter_table_export
 from utils.time_utils import iso_now
+from utils.rate_limiter import get_write_limiter
 
 # AWS Setup
 REGION = "us-east-1"
 FINAL_TABLE = "infoservices-cybersecurity-vuln-final-data"
 CVE_INDEX_TABLE = "infoservices-cybersecurity-vuln-cveindex"
+INDEX_WRITERS = 8  # threads, each with its own batch_writer (25 items/request)
+# Scans are I/O-bound, so run well past the core count; capped to keep the pool sane
+SCAN_SEGMENTS = min(int(os.environ.get("SCAN_SEGMENTS", 32)), 50)
+# When set, snapshot the final table via Export-to-S3 instead of scanning it
+EXPORT_BUCKET = os.environ.get("CVE_EXPORT_BUCKET")
+EXPORT_PREFIX = os.environ.get("CVE_EXPORT_PREFIX", "cve-index-sync/")
 
 def setup_dynamodb():
-    config = Config(
-        region_name=REGION,
-        max_pool_connections=50,
-        retries={"max_attempts": 5, "mode": "adaptive"},
-    )
-    return boto3.resource("dynamodb", config=config)
+    # one connection per scan/writer thread
+    return get_ddb_resource(REGION, max_pool_connections=max(SCAN_SEGMENTS + INDEX_WRITERS, 50))
 
 def create_cve_index_table(dynamodb):
     """
@@ -47,42 +50,93 @@ def sync_cve_ids(dynamodb, log=None):
     final_table = dynamodb.Table(FINAL_TABLE)
     index_table = dynamodb.Table(CVE_INDEX_TABLE)
 
-    log.info(f"🧩 Scanning {FINAL_TABLE} to collect all CVE IDs...")
-    items = parallel_scan(final_table, log=log, total_segments=4)
-
-    log.info(f"📦 Found {len(items)} total records in final table.")
-    existing_ids = set()
-
-    # Collect existing CVE IDs from index table
+    # Collect existing CVE IDs from index table (keys only, straight into the set)
     log.info(f"📋 Loading existing CVE IDs from {CVE_INDEX_TABLE} for deduplication...")
-    index_items = parallel_scan(index_table, log=log, total_segments=2)
-    existing_ids = {r["cve_id"] for r in index_items if "cve_id" in r}
+    existing_ids = {
+        r["cve_id"]
+        for r in parallel_scan_iter(index_table, log=log, total_segments=SCAN_SEGMENTS, projection=["cve_id"])
+        if "cve_id" in r
+    }
     log.info(f"✅ Loaded {len(existing_ids)} existing CVE IDs in index table.")
 
-    new_cves = [r["cve_id"] for r in items if "cve_id" in r and r["cve_id"] not in existing_ids]
-    log.info(f"🆕 Found {len(new_cves)} new CVE IDs to insert into index table.")
-
-    if not new_cves:
-        log.info("✅ No new CVEs to update.")
-        return
+    now = iso_now()  # one timestamp for the whole sync run
+    limiter = get_write_limiter()  # shared by all writer threads; None unless WCU_LIMIT is set
+    pending = queue.Queue(maxsize=INDEX_WRITERS * 100)
+    done = object()
 
-    def put_item(cve):
+    def write_shard():
+        """Returns the number of CVEs written; 0 when the writer failed."""
+        taken = 0
         try:
-            index_table.put_item(
-                Item={
-                    "cve_id": cve,
-                    "uploaded_date": iso_now()
-                }
-            )
-            return True
+            # batch_writer flushes BatchWriteItem requests of 25 and resends
+            # UnprocessedItems; throttling is covered by the adaptive retries.
+            with index_table.batch_writer(overwrite_by_pkeys=["cve_id"]) as batch:
+                while (cve := pending.get()) is not done:
+                    taken += 1
+                    if limiter:
+                        limiter.acquire()
+                    batch.put_item(Item={"cve_id": cve, "uploaded_date": now})
         except Exception as e:
-            log.error(f"❌ Failed to insert {cve}: {e}")
-            return False
+            # Stop pulling: the rest of the queue is left to the healthy writers.
+            # None of this writer's items is confirmed, so all count as failed.
+            log.error(f"❌ CVE index writer failed; {taken} queued CVEs not confirmed: {e}")
+            return 0
+        return taken
+
+    # Stream the final-table snapshot straight into the writers — no full item list in memory
+    if EXPORT_BUCKET:
+        log.info(f"🧩 Exporting {FINAL_TABLE} to S3 to collect all CVE IDs...")
+        final_cves = (
+            r["cve_id"].get("S")
+            for r in iter_table_export(final_table, EXPORT_BUCKET, EXPORT_PREFIX, log=log)
+            if "cve_id" in r
+        )
+    else:
+        log.info(f"🧩 Scanning {FINAL_TABLE} to collect all CVE IDs...")
+        final_cves = (
+            r.get("cve_id")
+            for r in parallel_scan_iter(final_table, log=log, total_segments=SCAN_SEGMENTS, projection=["cve_id"])
+        )
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
-        list(executor.map(put_item, new_cves))
+    scanned, new_cves, aborted = 0, 0, False
+    with concurrent.futures.ThreadPoolExecutor(max_workers=INDEX_WRITERS) as executor:
+        writers = [executor.submit(write_shard) for _ in range(INDEX_WRITERS)]
+
+        def enqueue(item):
+            """Blocking put that gives up once no writer is left to consume the queue."""
+            while True:
+                try:
+                    pending.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    if all(w.done() for w in writers):
+                        return False
+
+        try:
+            for cve in final_cves:
+                scanned += 1
+                if cve and cve not in existing_ids:
+                    if not enqueue(cve):
+                        log.error("❌ Every CVE index writer failed — stopping the scan")
+                        aborted = True
+                        break
+                    existing_ids.add(cve)
+                    new_cves += 1
+        finally:
+            for _ in writers:
+                enqueue(done)
+        written = sum(w.result() for w in writers)
+
+    log.info(f"📦 Found {scanned} total records in final table.")
+    failed = new_cves - written
+    if failed or aborted:
+        log.error(f"❌ {failed} of {new_cves} new CVEs were not written to {CVE_INDEX_TABLE}; rerun to backfill them")
+        raise RuntimeError(f"CVE index sync failed for {failed} CVEs")
+    if not new_cves:
+        log.info("✅ No new CVEs to update.")
+        return
 
-    log.info(f"✅ CVE Index table updated with {len(new_cves)} new records.")
+    log.info(f"✅ CVE Index table updated with {written} new records.")
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
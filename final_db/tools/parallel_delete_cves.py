@@ -1,7 +1,10 @@
-import boto3
 import logging
+import queue
+import threading
+import concurrent.futures
 from utils.cve_utils import normalize_cve
-from utils.dynamo_helpers import parallel_scan  # ✅ your existing utility
+from utils.dynamo_helpers import get_ddb_resource, parallel_scan_iter  # ✅ your existing utility
+from utils.rate_limiter import get_write_limiter
 
 # AWS region and table names
 region = "us-east-1"
@@ -11,7 +14,7 @@ atk_table_name = "infoservices-cybersecurity-vuln-static-AttackerKB"
 exp_table_name = "infoservices-cybersecurity-vuln-static-exploit-output"
 
 # DynamoDB setup
-dynamodb = boto3.resource("dynamodb", region_name=region)
+dynamodb = get_ddb_resource(region)  # adaptive retries for batch_writer unprocessed items
 final_table = dynamodb.Table(final_table_name)
 atk_table = dynamodb.Table(atk_table_name)
 exp_table = dynamodb.Table(exp_table_name)
@@ -20,65 +23,102 @@ exp_table = dynamodb.Table(exp_table_name)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("parallel-delete")
 
-def get_all_cves_parallel(table, key_fields, total_segments=8):
+def iter_cves_parallel(table, key_fields, total_segments=8):
     """
-    Parallel scan for fetching all CVE IDs from a source DynamoDB table.
+    Parallel scan yielding normalized CVE IDs from a source DynamoDB table.
+    Streams — nothing is collected, so memory stays flat however large the table.
     """
-    cves = set()
     log.info(f"⚙️ Starting parallel scan for {table.name} (segments={total_segments})")
 
-    items = parallel_scan(
-        table,
-        total_segments=total_segments,
-        log=log
-    )
-
-    log.info(f"📦 Scan complete for {table.name}: {len(items)} items fetched")
-
-    for item in items:
+    scanned = 0
+    # Only the candidate key columns are read back — the rest of each item is dead weight
+    for item in parallel_scan_iter(table, total_segments=total_segments, log=log, projection=key_fields):
+        scanned += 1
         cve = None
         for f in key_fields:
             if f in item and item[f]:
                 cve = item[f]
                 break
+        cve = normalize_cve(cve) if cve else None
         if cve:
-            cves.add(normalize_cve(cve))
+            yield cve
 
-    log.info(f"✅ Found {len(cves)} normalized CVEs in {table.name}")
-    return cves
+    log.info(f"📦 Scan complete for {table.name}: {scanned} items fetched")
 
 
 # ===============================
-# Step 1 — Collect CVEs from sources
+# Delete workers — each owns one batch_writer (flushes every 25 keys)
 # ===============================
-log.info("🔍 Collecting CVEs from Attackerkb...")
-atk_cves = get_all_cves_parallel(atk_table, ["Name", "CVE", "cve_id"])
-log.info(f"✅ Found {len(atk_cves)} Attackerkb CVEs")
-
-log.info("🔍 Collecting CVEs from Exploit-Output...")
-exp_cves = get_all_cves_parallel(exp_table, ["CVE_ID", "CVE", "cve_id"])
-log.info(f"✅ Found {len(exp_cves)} Exploit-Output CVEs")
-
-total_cves = atk_cves.union(exp_cves)
-log.info(f"🧩 Total {len(total_cves)} CVEs to delete from final table")
+sent = 0  # deletes handed to a batch_writer so far (progress only, not confirmed)
+sent_lock = threading.Lock()
+delete_workers = 16
+limiter = get_write_limiter()  # one bucket shared by all delete workers (WCU_LIMIT)
+done_marker = object()
+
+# One bounded queue per worker; a CVE always hashes to the same worker, so a key
+# found in both source tables usually lands in the same flush window, where
+# overwrite_by_pkeys collapses it. Any repeat that slips through is just an
+# idempotent delete of a missing key.
+worker_queues = [queue.Queue(maxsize=1000) for _ in range(delete_workers)]
+
+def delete_worker(q):
+    """
+    Returns (deleted, failed). Deletes only count once the final flush succeeded;
+    a failed worker keeps draining its queue (the scan routes keys to it by hash)
+    and counts everything it held or drained as failed.
+    """
+    global sent
+    taken = 0
+    seen_done = False  # the final flush can fail after the marker was taken
+    try:
+        with final_table.batch_writer(overwrite_by_pkeys=["cve_id"]) as batch:
+            while (cve := q.get()) is not done_marker:
+                taken += 1
+                if limiter:
+                    limiter.acquire()
+                batch.delete_item(Key={"cve_id": cve})
+                with sent_lock:
+                    sent += 1
+                    n = sent
+                if n % 1000 == 0:
+                    log.info(f"🗑️ Sent {n} CVE deletes so far")
+            seen_done = True
+        return taken, 0
+    except Exception as e:
+        dropped = 0
+        if not seen_done:
+            while q.get() is not done_marker:  # keep draining so the scan never blocks
+                dropped += 1
+        log.error(f"❌ Delete worker failed: {taken} deletes unconfirmed, {dropped} more dropped: {e}")
+        return 0, taken + dropped
 
 # ===============================
-# Step 2 — Delete CVEs from final table
+# Stream CVEs from sources straight into the delete workers
 # ===============================
-count = 0
-batch_size = 1000  # You can increase if you have many CVEs
-cve_list = list(total_cves)
-
-log.info(f"🗑️ Starting batch delete of {len(cve_list)} CVEs...")
-
-for i in range(0, len(cve_list), batch_size):
-    chunk = cve_list[i:i + batch_size]
-    with final_table.batch_writer() as batch:
-        for cve in chunk:
-            if not cve:
-                continue
-            batch.delete_item(Key={"cve_id": cve})
-            count += 1
-    log.info(f"✅ Deleted {min(i + batch_size, len(cve_list))}/{len(cve_list)} CVEs")
-
-log.info(f"🧹 Finished deleting {count} CVEs from final table.")
+sources = [
+    ("Attackerkb", atk_table, ["Name", "CVE", "cve_id"]),
+    ("Exploit-Output", exp_table, ["CVE_ID", "CVE", "cve_id"]),
+]
+
+log.info("🗑️ Starting streaming batch delete from final table...")
+with concurrent.futures.ThreadPoolExecutor(max_workers=delete_workers) as executor:
+    futures = [executor.submit(delete_worker, q) for q in worker_queues]
+    try:
+        for label, table, key_fields in sources:
+            log.info(f"🔍 Collecting CVEs from {label}...")
+            found = 0
+            for cve in iter_cves_parallel(table, key_fields):
+                worker_queues[hash(cve) % delete_workers].put(cve)
+                found += 1
+            log.info(f"✅ Queued {found} {label} CVEs for deletion")
+    finally:
+        for q in worker_queues:
+            q.put(done_marker)
+    results = [f.result() for f in futures]
+
+deleted = sum(d for d, _ in results)
+failed = sum(f for _, f in results)
+log.info(f"🧹 Finished deleting {deleted} CVEs from final table.")
+if failed:
+    log.error(f"❌ {failed} CVE deletes failed; those rows may still be in the final table — rerun to retry them")
+    raise RuntimeError(f"Final-table delete failed for {failed} CVEs")
@@ -1,2 +1,4 @@
 # transformations/__init__.py
+# Every clean_and_rename declares its output schema as `.columns`; the loaders
+# build each source's update expression from it once instead of per record.
 from . import nvd_transform, cisa_transform, exploitdb_transform, metasploit_transform
@@ -3,8 +3,9 @@ CISA transformation (strict schema with CVE inclusion)
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.time_utils import iso_now
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -23,41 +24,38 @@ CISA_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
-
-
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
-
-    # Always include CVE
-    cve = _get_field(record, ["cveID", "cve_id", "CVE"])
-    out["cve_id"] = cve
-
-    rename_map = {
-        "vendorProject": "vendor_project",
-        "product": "product",
-        "vulnerabilityName": "vulnerability_name",
-        "shortDescription": "short_description",
-        "requiredAction": "required_action",
-        "dueDate": "cisa_dueDate",
-        "knownRansomwareCampaignUse": "known_ransomware_use",
-        "notes": "notes",
-        "cwes": "cwes",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+# CVE header aliases in priority order (module constant: no list built per record)
+_CISA_CVE_KEYS = ("cveID", "cve_id", "CVE")
+
+# Source field → final column, resolved once at import (iterated per record)
+_CISA_RENAME = (
+    ("vendorProject", "vendor_project"),
+    ("product", "product"),
+    ("vulnerabilityName", "vulnerability_name"),
+    ("shortDescription", "short_description"),
+    ("requiredAction", "required_action"),
+    ("dueDate", "cisa_dueDate"),
+    ("knownRansomwareCampaignUse", "known_ransomware_use"),
+    ("notes", "notes"),
+    ("cwes", "cwes"),
+)
+
+
+def clean_and_rename(record: Dict[str, Any], uploaded_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # Always include CVE — records without one can't be joined, so skip the renaming work
+    cve = first_present(record, _CISA_CVE_KEYS)
+    if not cve:
+        return None
+    out: Dict[str, Any] = {"cve_id": cve}
+
+    for old, new in _CISA_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    out["uploaded_date"] = iso_now()
-
-    # fill missing fields with None
-    for col in CISA_FINAL_COLUMNS:
-        out.setdefault(col, None)
+    out["uploaded_date"] = uploaded_date or iso_now()
 
     return out
+
+
+clean_and_rename.columns = tuple(CISA_FINAL_COLUMNS)
@@ -3,9 +3,10 @@ EPSS transformation (strict schema with CVE inclusion)
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.time_utils import iso_now
 from decimal import Decimal
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -17,22 +18,21 @@ EPSS_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Header aliases in priority order, shared by the row and frame paths
+_EPSS_CVE_KEYS = ("cve", "CVE", "cve_id")
+_EPSS_SCORE_KEYS = ("epss", "EPSS", "score", "epss_value")
+_EPSS_PERCENTILE_KEYS = ("percentile", "Percentile", "epss_percentile")
 
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
+def clean_and_rename(record: Dict[str, Any], uploaded_date: Optional[str] = None) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
 
     # --- CVE ---
-    cve = _get_field(record, ["cve", "CVE", "cve_id"])
+    cve = first_present(record, _EPSS_CVE_KEYS)
     out["cve_id"] = str(cve).strip() if cve else None
 
     # --- EPSS score ---
-    epss_val = _get_field(record, ["epss", "EPSS", "score", "epss_value"])
+    epss_val = first_present(record, _EPSS_SCORE_KEYS)
     try:
         epss_val = float(epss_val)
     except Exception:
@@ -40,7 +40,7 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     out["epss_value"] = Decimal(str(epss_val)) if epss_val is not None else None
 
     # --- Percentile ---
-    perc_val = _get_field(record, ["percentile", "Percentile", "epss_percentile"])
+    perc_val = first_present(record, _EPSS_PERCENTILE_KEYS)
     try:
         perc_val = float(perc_val)
     except Exception:
@@ -48,10 +48,59 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     out["epss_percentile"] = Decimal(str(perc_val)) if perc_val is not None else None
 
     # Add uploaded date
-    out["uploaded_date"] = iso_now()
-
-    # Ensure all keys exist
-    for col in EPSS_FINAL_COLUMNS:
-        out.setdefault(col, None)
+    out["uploaded_date"] = uploaded_date or iso_now()
 
     return out
+
+
+def _first_column(df, names):
+    """Column-wise _get_field: coalesce the first of `names` present in the frame."""
+    col = None
+    for n in names:
+        if n in df:
+            col = df[n] if col is None else col.combine_first(df[n])
+    return col
+
+
+def _to_decimals(pd, col, size):
+    if col is None:
+        return [None] * size
+    values = pd.to_numeric(col, errors="coerce").tolist()
+    return [Decimal(repr(v)) if v == v else None for v in values]  # NaN != NaN
+
+
+def transform_epss_records(records, uploaded_date: Optional[str] = None):
+    """
+    Vectorized clean_and_rename() for a whole EPSS feed.
+    Numeric parsing runs column-wise in pandas; values are turned into Decimal
+    only at the end, as DynamoDB requires.
+    """
+    import pandas as pd
+
+    records = list(records)
+    if not records:
+        return []
+
+    df = pd.DataFrame.from_records(records)
+    size = len(df)
+
+    cve_col = _first_column(df, _EPSS_CVE_KEYS)
+    if cve_col is None:
+        cve_ids = [None] * size
+    else:
+        # string dtype yields pd.NA for missing values — map those (and blanks) to None
+        cve_ids = [c if isinstance(c, str) and c else None for c in cve_col.astype("string").str.strip().tolist()]
+
+    epss_values = _to_decimals(pd, _first_column(df, _EPSS_SCORE_KEYS), size)
+    percentiles = _to_decimals(pd, _first_column(df, _EPSS_PERCENTILE_KEYS), size)
+
+    uploaded_date = uploaded_date or iso_now()
+    return [
+        {"cve_id": c, "epss_value": e, "epss_percentile": p, "uploaded_date": uploaded_date}
+        for c, e, p in zip(cve_ids, epss_values, percentiles)
+    ]
+
+
+clean_and_rename.columns = tuple(EPSS_FINAL_COLUMNS)
+# Vectorized entry point; the left-join loader feeds it scan chunks instead of single records
+clean_and_rename.batch = transform_epss_records
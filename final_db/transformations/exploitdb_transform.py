@@ -7,6 +7,8 @@ Metasploit transformation (strict schema with CVE inclusion)
 import logging
 from typing import Dict, Any, Optional
 from utils.time_utils import iso_now
+from utils.cve_utils import extract_cves
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -28,44 +30,48 @@ EXPLOIT_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names) -> Optional[Any]:
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+# CVE header aliases in priority order (module constant: no list built per record)
+_EXPLOITDB_CVE_KEYS = ("CVE_id", "cve_id", "cveID")
 
+_EXPLOITDB_MAPPING = (
+    ("id", "exploit_id"),
+    ("description", "exploit_description"),
+    ("file", "exploit_file"),
+    ("author", "exploit_author"),
+    ("type", "exploit_type"),
+    ("codes", "exploit_codes"),
+    ("platform", "exploit_platform"),
+    ("tags", "exploit_tags"),
+    ("aliases", "exploit_aliases"),
+    ("screenshot_url", "screenshot_url"),
+    ("application_url", "application_url"),
+    ("source_url", "source_url"),
+)
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
+
+def clean_and_rename(record: Dict[str, Any], uploaded_date: Optional[str] = None) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
 
     # Include CVE
-    cve = _get_field(record, ["CVE_id", "cve_id", "cveID"])
+    cve = first_present(record, _EXPLOITDB_CVE_KEYS)
+    if not cve:
+        # Exploit-DB lists identifiers in `codes` ("CVE-2019-1234;OSVDB-1234" or a list)
+        codes = record.get("codes")
+        if isinstance(codes, (list, tuple)):
+            codes = ";".join(str(c) for c in codes)
+        found = extract_cves(codes)
+        cve = found[0] if found else None
     out["cve_id"] = cve
 
-    mapping = {
-        "id": "exploit_id",
-        "description": "exploit_description",
-        "file": "exploit_file",
-        "author": "exploit_author",
-        "type": "exploit_type",
-        "codes": "exploit_codes",
-        "platform": "exploit_platform",
-        "tags": "exploit_tags",
-        "aliases": "exploit_aliases",
-        "screenshot_url": "screenshot_url",
-        "application_url": "application_url",
-        "source_url": "source_url",
-
-    }
-
-    for old, new in mapping.items():
-        val = _get_field(record, [old])
+    for old, new in _EXPLOITDB_MAPPING:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    out["uploaded_date"] = iso_now()
-
-    for col in EXPLOIT_FINAL_COLUMNS:
-        out.setdefault(col, None)
+    out["uploaded_date"] = uploaded_date or iso_now()
 
     return out
+
+
+clean_and_rename.columns = tuple(EXPLOIT_FINAL_COLUMNS)
@@ -5,6 +5,7 @@ Metasploit transformation (strict schema with CVE inclusion)
 import logging
 from typing import Dict, Any, Optional
 from utils.time_utils import iso_now
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -14,7 +15,7 @@ METASPLOIT_FINAL_COLUMNS = [
     "metasploit_ref_name",
     "metasploit_fullname",
     "metasploit_aliases",
-    "rank",
+    "metasploit_rank",
     "metasploit_type",
     "metasploit_author",
     "metasploit_description",
@@ -27,44 +28,42 @@ METASPLOIT_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names) -> Optional[Any]:
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+# CVE header aliases in priority order (module constant: no list built per record)
+_METASPLOIT_CVE_KEYS = ("CVE", "cve_id", "cveID")
 
+_METASPLOIT_MAPPING = (
+    ("name", "metasploit_module_name"),
+    ("ref_name", "metasploit_ref_name"),
+    ("fullname", "metasploit_fullname"),
+    ("aliases", "metasploit_aliases"),
+    ("rank", "metasploit_rank"),
+    ("type", "metasploit_type"),
+    ("author", "metasploit_author"),
+    ("description", "metasploit_description"),
+    ("references", "metasploit_references"),
+    ("platform", "metasploit_platform"),
+    ("autofilter_services", "autofilter_services"),
+    ("rport", "rport"),
+    ("path", "metasploit_path"),
+)
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
 
-    # Include CVE
-    cve = _get_field(record, ["CVE", "cve_id", "cveID"])
-    out["cve_id"] = cve
+def clean_and_rename(record: Dict[str, Any], uploaded_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # Include CVE — records without one can't be joined, so skip the renaming work
+    cve = first_present(record, _METASPLOIT_CVE_KEYS)
+    if not cve:
+        return None
+    out: Dict[str, Any] = {"cve_id": cve}
 
-    mapping = {
-        "name": "metasploit_module_name",
-        "ref_name": "metasploit_ref_name",
-        "fullname": "metasploit_fullname",
-        "aliases": "metasploit_aliases",
-        "rank": "metasploit_rank",
-        "type": "metasploit_type",
-        "author": "metasploit_author",
-        "description": "metasploit_description",
-        "references": "metasploit_references",
-        "platform": "metasploit_platform",
-        "autofilter_services": "autofilter_services",
-        "rport": "rport",
-        "path": "metasploit_path",
-    }
-
-    for old, new in mapping.items():
-        val = _get_field(record, [old])
+    for old, new in _METASPLOIT_MAPPING:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    out["uploaded_date"] = iso_now()
-
-    for col in METASPLOIT_FINAL_COLUMNS:
-        out.setdefault(col, None)
+    out["uploaded_date"] = uploaded_date or iso_now()
 
     return out
+
+
+clean_and_rename.columns = tuple(METASPLOIT_FINAL_COLUMNS)
@@ -7,6 +7,7 @@ NVD transformation (strict schema with logging):
 import logging
 from typing import Dict, Any, Optional
 from utils.time_utils import iso_now
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -23,13 +24,6 @@ NVD_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
-
-
 def extract_cvss(metric_section: Any) -> Optional[Dict[str, Any]]:
     if not metric_section or not isinstance(metric_section, dict):
         return None
@@ -42,46 +36,63 @@ def extract_cvss(metric_section: Any) -> Optional[Dict[str, Any]]:
             cvss_data = metric.get("cvssData", {}).get("M", {})
             for k, v in cvss_data.items():
                 if isinstance(v, dict):
-                    cvss_map[k] = list(v.values())[0]
+                    # Unwrap DynamoDB JSON ({"S": ...}/{"N": ...}) without building a list
+                    cvss_map[k] = v["S"] if "S" in v else v["N"] if "N" in v else next(iter(v.values()))
                 else:
                     cvss_map[k] = v
             return cvss_map
     except Exception as e:
-        log.warning(f"⚠️ NVD extract_cvss error: {e}")
+        log.warning("⚠️ NVD extract_cvss error: %s", e)  # lazy: can fire once per record
     return None
 
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
+# Fallback CVE header aliases, probed only when "id" is missing
+_NVD_CVE_KEYS = ("cveID", "CVE_ID", "CVE")
+
+# Source field → final column, resolved once at import (iterated per record)
+_NVD_RENAME = (
+    ("references", "nvd_references"),
+    ("weakness", "weakness"),
+    ("descriptions", "nvd_descriptions"),
+)
+
+_NVD_METRIC_VERSIONS = (
+    ("cvssMetricV31", "metrics_cvssmetricv31"),
+    ("cvssMetricV30", "metrics_cvssmetricv30"),
+    ("cvssMetricV2", "metrics_cvssmetricv2"),
+    ("cvssMetricV40", "metrics_cvssmetricv40"),
+)
+# Lookup form: map a present metrics key straight to its column
+_NVD_METRIC_DEST = dict(_NVD_METRIC_VERSIONS)
+
+
+def clean_and_rename(record: Dict[str, Any], uploaded_date: Optional[str] = None) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
 
-    cve_val = _get_field(record, ["id", "cveID", "CVE_ID", "CVE"])
+    # Hot path: NVD rows key the CVE as "id"; only probe the aliases when it's missing
+    cve_val = record.get("id")
+    if cve_val is None:
+        cve_val = first_present(record, _NVD_CVE_KEYS)
     out["cve_id"] = cve_val
 
-    rename_map = {
-        "references": "nvd_references",
-        "weakness": "weakness",
-        "descriptions": "nvd_descriptions",
-    }
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+    for old, new in _NVD_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    metrics = _get_field(record, ["metrics", "Metrics"])
-    metric_versions = {
-        "cvssMetricV31": "metrics_cvssmetricv31",
-        "cvssMetricV30": "metrics_cvssmetricv30",
-        "cvssMetricV2": "metrics_cvssmetricv2",
-        "cvssMetricV40": "metrics_cvssmetricv40",
-    }
-    for src, dest in metric_versions.items():
-        if isinstance(metrics, dict) and src in metrics:
-            out[dest] = extract_cvss(metrics.get(src))
-
-    out["uploaded_date"] = iso_now()
+    # One type check for the whole block; records without metrics skip it entirely
+    metrics = record.get("metrics") or record.get("Metrics")
+    if isinstance(metrics, dict):
+        # Walk the versions the record actually carries (usually just v3.1)
+        # instead of probing all four
+        for src, section in metrics.items():
+            dest = _NVD_METRIC_DEST.get(src)
+            if dest is not None:
+                out[dest] = extract_cvss(section)
 
-    # Fill missing fields with None
-    for col in NVD_FINAL_COLUMNS:
-        out.setdefault(col, None)
+    out["uploaded_date"] = uploaded_date or iso_now()
 
     return out
+
+
+clean_and_rename.columns = tuple(NVD_FINAL_COLUMNS)
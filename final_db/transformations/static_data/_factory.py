@@ -0,0 +1,118 @@
+"""
+Shared skeleton of the simple static transforms (McAfee, packet, ransomware, threat-info,
+top10, exploit-output, exploitkit).
+
+Those datasets differ only in their schema, CVE aliases, rename table and
+provenance label, so each module declares that spec and builds its
+clean_and_rename / clean_and_rename_frame here.
+"""
+
+from functools import partial
+from utils.cve_utils import normalize_cve, normalize_cve_series
+from utils.frame_utils import rename_frame, finalize_frame
+
+# Placeholder values most static exports use for empty cells (a tuple: cells may be lists/maps)
+DEFAULT_NULLS = (None, "", "null", "NULL")
+
+
+def _present_test(nulls):
+    """
+    Generated-code expression that is true when `v` is not a placeholder.
+    - None and string placeholders become an identity check plus one frozenset
+      probe (strings only, so list/map cells never get hashed)
+    - Any other placeholder type falls back to tuple membership on `_NULLS`
+    """
+    if not all(n is None or isinstance(n, str) for n in nulls):
+        return "v not in _NULLS"
+    tests = ["v is not None"] if None in nulls else []
+    if any(isinstance(n, str) for n in nulls):
+        tests.append("not (isinstance(v, str) and v in _NULL_STRS)")
+    return " and ".join(tests) or "True"
+
+
+def _strip_quotes(value: str) -> str:
+    return value.strip().strip('"').strip("'")
+
+
+def make_transformer(final_columns, cve_keys, rename, source_column, source_label,
+                     nulls=DEFAULT_NULLS, strip_strings=False, normalize=normalize_cve):
+    """
+    Build clean_and_rename(record) for one static dataset.
+    - The template (every final column None, provenance marker set) is built once;
+      each record starts from one copy of it
+    - cve_id: first alias in cve_keys whose value isn't a placeholder, normalized
+    - rename: (source field, final column) pairs; placeholder values are skipped
+    - strip_strings: trim whitespace and quotes off mapped string values
+    - normalize: CVE normalizer (normalize_cve_trusted for already-canonical sources)
+    - The returned function declares its schema via `.columns` for the loaders
+    - The body is generated with the spec unrolled (one literal r.get() per field,
+      no loop over the rename table); see _transformer_source()
+    """
+    columns = tuple(final_columns)
+    namespace = {
+        "__name__": __name__,
+        "_TEMPLATE": {**dict.fromkeys(columns), source_column: source_label},
+        "_NULLS": tuple(nulls),
+        "_NULL_STRS": frozenset(n for n in nulls if isinstance(n, str)),
+        "_normalize": normalize,
+        "_strip_quotes": _strip_quotes,
+    }
+    source = _transformer_source(tuple(cve_keys), tuple(rename), strip_strings, _present_test(nulls))
+    exec(compile(source, f"<clean_and_rename {source_label}>", "exec"), namespace)
+    clean_and_rename = namespace["clean_and_rename"]
+    clean_and_rename.columns = columns
+    return clean_and_rename
+
+
+def _transformer_source(cve_keys, rename, strip_strings, present):
+    """Source of clean_and_rename() for one spec (keys are embedded via repr)."""
+    lines = ["def clean_and_rename(r):", "    out = _TEMPLATE.copy()"]
+    # cve_id: first non-placeholder alias wins, tried in order
+    for i, key in enumerate(cve_keys):
+        indent = "    " * (i + 1)
+        lines += [
+            f"{indent}v = r.get({key!r})",
+            f"{indent}if {present}:",
+            f"{indent}    out['cve_id'] = _normalize(v) if v else None",
+            f"{indent}else:",
+        ]
+    lines.append("    " * (len(cve_keys) + 1) + "out['cve_id'] = None")
+    for old, new in rename:
+        value = "_strip_quotes(v) if isinstance(v, str) else v" if strip_strings else "v"
+        lines += [
+            f"    v = r.get({old!r})",
+            f"    if {present}:",
+            f"        out[{new!r}] = {value}",
+        ]
+    lines.append("    return out")
+    return "\n".join(lines) + "\n"
+
+
+def make_frame_transformer(final_columns, cve_keys, rename, source_column, source_label,
+                           nulls=DEFAULT_NULLS, strip_strings=False):
+    """
+    Build the column-wise counterpart of make_transformer() for a whole DataFrame.
+    - Same spec, same output as the row transform, one row per input row
+    - CVEs always go through normalize_cve_series()
+    - Returned as a partial of a module-level function, so it stays picklable
+      for frame_utils.map_frame_chunks()
+    """
+    aliases = tuple((key, "cve_id") for key in cve_keys)
+    return partial(
+        _transform_frame, tuple(final_columns), aliases + tuple(rename),
+        source_column, source_label, tuple(nulls), strip_strings,
+    )
+
+
+def _transform_frame(columns, rename, source_column, source_label, nulls, strip_strings, df):
+    out = rename_frame(df, rename, nulls=nulls)
+    if strip_strings:
+        for col in out.columns.drop("cve_id", errors="ignore"):
+            if out[col].dtype.kind == "O":  # object or string dtype
+                # strip quotes/whitespace on string cells; other values pass through
+                stripped = out[col].str.strip().str.strip('"').str.strip("'")
+                out[col] = stripped.where(stripped.notna(), out[col])
+    if "cve_id" in out:
+        out["cve_id"] = normalize_cve_series(out["cve_id"])
+    out[source_column] = source_label
+    return finalize_frame(out, columns)
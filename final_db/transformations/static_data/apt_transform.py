@@ -5,6 +5,7 @@ Prefixed all mapped columns with 'apt_' to avoid field conflicts in final table.
 
 import logging
 from typing import Dict, Any
+from utils.frame_utils import rows_with_cve, rename_frame, finalize_frame
 
 log = logging.getLogger(__name__)
 
@@ -48,67 +49,81 @@ APT_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_APT_RENAME = (
+    ("APT_Group", "apt_group"),
+    ("APT_Name", "apt_name"),
+    ("Accociated_Groups", "apt_associated_groups"),
+    ("Associated_malware", "apt_associated_malware"),
+    ("Attacker_Motivation", "apt_attacker_motivation"),
+    ("Countries_Targeted", "apt_countries_targeted"),
+    ("CWE", "apt_cwe"),
+    ("Description", "apt_description"),
+    ("Industry_targeted", "apt_industry_targeted"),
+    ("Malwares_Used", "apt_malwares_used"),
+    ("Mitre_Tactics", "apt_mitre_tactics"),
+    ("MitreGroup-ID", "apt_mitregroup_id"),
+    ("MitreSoftware-ID", "apt_mitresoftware_id"),
+    ("MitreTechnique-ID", "apt_mitretechnique_id"),
+    ("MitreTechnique-ID_Name", "apt_mitretechnique_name"),
+    ("Exploit_(RCE/PE/DOS/WEBAPP)", "apt_exploit_type"),
+    ("Exploit_Kit_Used", "apt_exploit_kit_used"),
+    ("Exploit_Links", "apt_exploit_links"),
+    ("Nexpose", "apt_nexpose"),
+    ("Qualys", "apt_qualys"),
+    ("Tenable", "apt_tenable"),
+    ("Ransomware_Used", "apt_ransomware_used"),
+    ("Software_Used", "apt_software_used"),
+    ("Weapon_of_Choice/Attack_Methods", "apt_weapon_of_choice"),
+    ("Operating_Since", "apt_operating_since"),
+    ("Origin _Country", "apt_origin_country"),
+    ("Protocol_Used_(C&C,_Exfiltration)", "apt_protocol_used"),
+    ("Analysis_URLs", "apt_analysis_urls"),
+    ("Reference_Links", "apt_reference_links"),
+    ("Year", "apt_year"),
+    ("Sponsor", "apt_sponsor"),
+    ("Email", "apt_email"),
+    ("Acunetix", "apt_acunetix"),
+)
+
+_APT_COLUMNS = tuple(APT_FINAL_COLUMNS)
+
+# Every final column preset to None — each record starts from one C-level copy
+_APT_TEMPLATE = dict.fromkeys(_APT_COLUMNS)
 
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Clean and rename APT dataset records to match strict schema with apt_ prefix.
     """
-    out: Dict[str, Any] = {}
+    out: Dict[str, Any] = _APT_TEMPLATE.copy()
 
     # Always include CVE
-    cve = _get_field(record, ["CVE", "CVE_Exploited", "cve_id", "cveID"])
+    cve = record.get("CVE") or record.get("CVE_Exploited") or record.get("cve_id") or record.get("cveID")
     out["cve_id"] = cve
+    if not cve:
+        return out  # no join key — the loader drops it, skip the rename loop
 
-    # Prefixed rename map
-    rename_map = {
-        "APT_Group": "apt_group",
-        "APT_Name": "apt_name",
-        "Accociated_Groups": "apt_associated_groups",
-        "Associated_malware": "apt_associated_malware",
-        "Attacker_Motivation": "apt_attacker_motivation",
-        "Countries_Targeted": "apt_countries_targeted",
-        "CWE": "apt_cwe",
-        "Description": "apt_description",
-        "Industry_targeted": "apt_industry_targeted",
-        "Malwares_Used": "apt_malwares_used",
-        "Mitre_Tactics": "apt_mitre_tactics",
-        "MitreGroup-ID": "apt_mitregroup_id",
-        "MitreSoftware-ID": "apt_mitresoftware_id",
-        "MitreTechnique-ID": "apt_mitretechnique_id",
-        "MitreTechnique-ID_Name": "apt_mitretechnique_name",
-        "Exploit_(RCE/PE/DOS/WEBAPP)": "apt_exploit_type",
-        "Exploit_Kit_Used": "apt_exploit_kit_used",
-        "Exploit_Links": "apt_exploit_links",
-        "Nexpose": "apt_nexpose",
-        "Qualys": "apt_qualys",
-        "Tenable": "apt_tenable",
-        "Ransomware_Used": "apt_ransomware_used",
-        "Software_Used": "apt_software_used",
-        "Weapon_of_Choice/Attack_Methods": "apt_weapon_of_choice",
-        "Operating_Since": "apt_operating_since",
-        "Origin _Country": "apt_origin_country",
-        "Protocol_Used_(C&C,_Exfiltration)": "apt_protocol_used",
-        "Analysis_URLs": "apt_analysis_urls",
-        "Reference_Links": "apt_reference_links",
-        "Year": "apt_year",
-        "Sponsor": "apt_sponsor",
-        "Email": "apt_email",
-        "Acunetix": "apt_acunetix",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+    for old, new in _APT_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    # Fill missing columns with None
-    for col in APT_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
     return out
+
+
+clean_and_rename.columns = _APT_COLUMNS
+
+
+# CVE aliases in the order clean_and_rename() tries them
+_APT_CVE_ALIASES = (("CVE", "cve_id"), ("CVE_Exploited", "cve_id"), ("cve_id", "cve_id"), ("cveID", "cve_id"))
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole APT DataFrame (e.g. the source CSV).
+    - One output row per input row that carries a CVE, in APT_FINAL_COLUMNS order
+    - Missing values are None
+    """
+    df = rows_with_cve(df, _APT_CVE_ALIASES)
+    return finalize_frame(rename_frame(df, _APT_CVE_ALIASES + _APT_RENAME), _APT_COLUMNS)
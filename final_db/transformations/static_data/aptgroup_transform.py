@@ -4,6 +4,7 @@ APT Group transformation (static dataset)
 
 import logging
 from typing import Dict, Any
+from utils.record_utils import first_present
 
 log = logging.getLogger(__name__)
 
@@ -13,32 +14,33 @@ APTGROUP_FINAL_COLUMNS = [
     "aptgroup_name",
 ]
 
-def _get_field(record: Dict[str, Any], names):
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+
+# CVE aliases in priority order; source field → final column, resolved once at import
+_APTGROUP_CVE_KEYS = ("CVE", "CVE_ID", "cve_id", "cve_exploited")
+_APTGROUP_RENAME = (
+    ("apt_group", "aptgroup_name"),
+)
+
+_APTGROUP_COLUMNS = tuple(APTGROUP_FINAL_COLUMNS)
+# Every final column preset to None — each record starts from one C-level copy
+_APTGROUP_TEMPLATE = dict.fromkeys(_APTGROUP_COLUMNS)
+
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Clean and rename APT Group dataset records to match strict schema.
     """
-    out: Dict[str, Any] = {}
+    out: Dict[str, Any] = _APTGROUP_TEMPLATE.copy()
 
     # Always include CVE ID
-    cve = _get_field(record, ["CVE", "CVE_ID", "cve_id", "cve_exploited"])
-    out["cve_id"] = cve
-
-    rename_map = {
-        "apt_group": "aptgroup_name",    }
+    out["cve_id"] = first_present(record, _APTGROUP_CVE_KEYS)
 
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+    for old, new in _APTGROUP_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    # Fill missing columns with None (DynamoDB stores as NULL)
-    for col in APTGROUP_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
     return out
+
+
+clean_and_rename.columns = _APTGROUP_COLUMNS
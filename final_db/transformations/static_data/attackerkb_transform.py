@@ -5,6 +5,7 @@ All mapped fields are prefixed with `attackerkb_` to avoid collisions in the fin
 
 import logging
 from typing import Dict, Any
+from utils.frame_utils import rows_with_cve, rename_frame, finalize_frame
 
 log = logging.getLogger(__name__)
 
@@ -28,12 +29,29 @@ ATTACKERKB_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return first present key from names (case-sensitive as stored in CSV → Dynamo item)."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_ATTACKERKB_RENAME = (
+    ("Created", "attackerkb_created"),
+    ("cvssV3", "attackerkb_cvssv3"),
+    ("Disclosure Date", "attackerkb_disclosure_date"),
+    ("Document", "attackerkb_document"),
+    ("Editor Id", "attackerkb_editor_id"),
+    ("Exploitability Score", "attackerkb_exploitability_score"),
+    ("ID", "attackerkb_id"),
+    ("Impact Score", "attackerkb_impact_score"),
+    ("Reference Link", "attackerkb_reference_link"),
+    ("Revision Date", "attackerkb_revision_date"),
+    ("score", "attackerkb_score"),
+    ("tags", "attackerkb_tags"),
+    ("vulnerable-versions", "attackerkb_vulnerable_versions"),
+    ("vulnerable_versions", "attackerkb_vulnerable_versions"),
+)
+
+_ATTACKERKB_COLUMNS = tuple(ATTACKERKB_FINAL_COLUMNS)
+
+# Every final column preset to None, provenance marker included — each record
+# starts from one C-level copy with nothing constant left to write
+_ATTACKERKB_TEMPLATE = {**dict.fromkeys(_ATTACKERKB_COLUMNS), "attackerkb_source": "attackerkb"}
 
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
@@ -43,39 +61,36 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     - Prefixes mapped columns with attackerkb_
     - Defaults missing values to None (→ DynamoDB NULL)
     """
-    out: Dict[str, Any] = {}
+    out: Dict[str, Any] = _ATTACKERKB_TEMPLATE.copy()
 
     # CVE may exist in "Name" (primary) or "Reference CVE" (fallback)
-    cve = _get_field(record, ["Name", "cve", "CVE", "cve_id"])
+    cve = record.get("Name") or record.get("cve") or record.get("CVE") or record.get("cve_id")
     out["cve_id"] = cve
+    if not cve:
+        return out  # no join key — the loader drops it, skip the rename loop
 
-    rename_map = {
-        "Created": "attackerkb_created",
-        "cvssV3": "attackerkb_cvssv3",
-        "Disclosure Date": "attackerkb_disclosure_date",
-        "Document": "attackerkb_document",
-        "Editor Id": "attackerkb_editor_id",
-        "Exploitability Score": "attackerkb_exploitability_score",
-        "ID": "attackerkb_id",
-        "Impact Score": "attackerkb_impact_score",
-        "Reference Link": "attackerkb_reference_link",
-        "Revision Date": "attackerkb_revision_date",
-        "score": "attackerkb_score",
-        "tags": "attackerkb_tags",
-        "vulnerable-versions": "attackerkb_vulnerable_versions",
-        "vulnerable_versions": "attackerkb_vulnerable_versions",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+    for old, new in _ATTACKERKB_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    # Add provenance
-    out["attackerkb_source"] = "attackerkb"
+    return out
 
-    # Fill missing columns with None (DynamoDB → NULL)
-    for col in ATTACKERKB_FINAL_COLUMNS:
-        out.setdefault(col, None)
 
-    return out
+clean_and_rename.columns = _ATTACKERKB_COLUMNS
+
+
+# CVE aliases in the order clean_and_rename() tries them
+_ATTACKERKB_CVE_ALIASES = (("Name", "cve_id"), ("cve", "cve_id"), ("CVE", "cve_id"), ("cve_id", "cve_id"))
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole Attackerkb DataFrame (e.g. the source CSV).
+    - One output row per input row that carries a CVE, in ATTACKERKB_FINAL_COLUMNS order
+    - Missing values are None
+    """
+    df = rows_with_cve(df, _ATTACKERKB_CVE_ALIASES)
+    out = rename_frame(df, _ATTACKERKB_CVE_ALIASES + _ATTACKERKB_RENAME)
+    out["attackerkb_source"] = "attackerkb"
+    return finalize_frame(out, _ATTACKERKB_COLUMNS)
@@ -5,7 +5,8 @@ All mapped fields are prefixed with `chinese1_` to avoid name collisions.
 
 import logging
 from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ for consistent CVE format (CVE-YYYY-NNNN)
+from utils.cve_utils import normalize_cve, normalize_cve_series  # ✅ for consistent CVE format (CVE-YYYY-NNNN)
+from utils.frame_utils import rows_with_cve, rename_frame, finalize_frame
 
 log = logging.getLogger(__name__)
 
@@ -40,12 +41,39 @@ CHINESE_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return first present key from names (case-sensitive as stored in CSV → DynamoDB)."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_CHINESE_RENAME = (
+    ("APT Attack method", "chinese_vuln_apt_attack_method"),
+    ("APT Groups", "chinese_vuln_apt_groups"),
+    ("APT software used", "chinese_vuln_apt_software_used"),
+    ("CVSSV2 Score", "chinese_vuln_cvssv2_score"),
+    ("CVSSV2 Vector", "chinese_vuln_cvssv2_vector"),
+    ("CVSSV3 Score", "chinese_vuln_cvssv3_score"),
+    ("CVSSV3 Vector", "chinese_vuln_cvssv3_vector"),
+    ("CWE id", "chinese_vuln_cwe_id"),
+    ("Exploit Kit", "chinese_vuln_exploit_kit"),
+    ("Exploit Links", "chinese_vuln_exploit_links"),
+    ("Exploit Type", "chinese_vuln_exploit_type"),
+    ("Exploit(Y/N)", "chinese_vuln_exploit_available"),
+    ("Malware", "chinese_vuln_malware"),
+    ("Metasploit", "chinese_vuln_metasploit"),
+    ("Nexpose id", "chinese_vuln_nexpose_id"),
+    ("Product", "chinese_vuln_product"),
+    ("Qualys Plugin-ID", "chinese_vuln_qualys_plugin_id"),
+    ("Ransomware", "chinese_vuln_ransomware"),
+    ("Script", "chinese_vuln_script"),
+    ("Target industries", "chinese_vuln_target_industries"),
+    ("TargetCountries", "chinese_vuln_target_countries"),
+    ("Tenable Plugin-ID", "chinese_vuln_tenable_plugin_id"),
+    ("Vendor", "chinese_vuln_vendor"),
+    ("version", "chinese_vuln_version"),
+)
+
+_CHINESE_COLUMNS = tuple(CHINESE_FINAL_COLUMNS)
+
+# Every final column preset to None, provenance marker included — each record
+# starts from one C-level copy with nothing constant left to write
+_CHINESE_TEMPLATE = {**dict.fromkeys(_CHINESE_COLUMNS), "chinese_vuln_source": "chinese-vulnerabilities"}
 
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
@@ -55,49 +83,38 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     - Prefix mapped columns with chinese_vuln_
     - Fill missing fields with None (→ DynamoDB NULL)
     """
-    out: Dict[str, Any] = {}
+    out: Dict[str, Any] = _CHINESE_TEMPLATE.copy()
 
     # Always include normalized CVE
-    cve = _get_field(record, ["CVE", "cve_id", "Name"])
+    cve = record.get("CVE") or record.get("cve_id") or record.get("Name")
     out["cve_id"] = normalize_cve(cve) if cve else None
+    if out["cve_id"] is None:
+        return out  # no join key — the loader drops it, skip the rename loop
 
-    rename_map = {
-        "APT Attack method": "chinese_vuln_apt_attack_method",
-        "APT Groups": "chinese_vuln_apt_groups",
-        "APT software used": "chinese_vuln_apt_software_used",
-        "CVSSV2 Score": "chinese_vuln_cvssv2_score",
-        "CVSSV2 Vector": "chinese_vuln_cvssv2_vector",
-        "CVSSV3 Score": "chinese_vuln_cvssv3_score",
-        "CVSSV3 Vector": "chinese_vuln_cvssv3_vector",
-        "CWE id": "chinese_vuln_cwe_id",
-        "Exploit Kit": "chinese_vuln_exploit_kit",
-        "Exploit Links": "chinese_vuln_exploit_links",
-        "Exploit Type": "chinese_vuln_exploit_type",
-        "Exploit(Y/N)": "chinese_vuln_exploit_available",
-        "Malware": "chinese_vuln_malware",
-        "Metasploit": "chinese_vuln_metasploit",
-        "Nexpose id": "chinese_vuln_nexpose_id",
-        "Product": "chinese_vuln_product",
-        "Qualys Plugin-ID": "chinese_vuln_qualys_plugin_id",
-        "Ransomware": "chinese_vuln_ransomware",
-        "Script": "chinese_vuln_script",
-        "Target industries": "chinese_vuln_target_industries",
-        "TargetCountries": "chinese_vuln_target_countries",
-        "Tenable Plugin-ID": "chinese_vuln_tenable_plugin_id",
-        "Vendor": "chinese_vuln_vendor",
-        "version": "chinese_vuln_version",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
+    for old, new in _CHINESE_RENAME:
+        val = record.get(old)
         if val is not None:
             out[new] = val
 
-    # Add source marker
-    out["chinese_vuln_source"] = "chinese-vulnerabilities"
+    return out
 
-    # Fill missing columns with None (DynamoDB NULL)
-    for col in CHINESE_FINAL_COLUMNS:
-        out.setdefault(col, None)
 
-    return out
+clean_and_rename.columns = _CHINESE_COLUMNS
+
+
+# CVE aliases in the order clean_and_rename() tries them
+_CHINESE_CVE_ALIASES = (("CVE", "cve_id"), ("cve_id", "cve_id"), ("Name", "cve_id"))
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole Chinese Vulnerabilities DataFrame.
+    - CVEs are normalized column-wise with a single regex extract
+    - One output row per input row that carries a CVE, in CHINESE_FINAL_COLUMNS order
+    """
+    df = rows_with_cve(df, _CHINESE_CVE_ALIASES)
+    out = rename_frame(df, _CHINESE_CVE_ALIASES + _CHINESE_RENAME)
+    if "cve_id" in out:
+        out["cve_id"] = normalize_cve_series(out["cve_id"])
+    out["chinese_vuln_source"] = "chinese-vulnerabilities"
+    return finalize_frame(out, _CHINESE_COLUMNS)
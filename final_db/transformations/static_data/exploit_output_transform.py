@@ -4,8 +4,7 @@ All mapped fields are prefixed with `exploit_` to avoid collisions in the final
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ Normalize CVE format (CVE-YYYY-NNNN)
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -24,48 +23,32 @@ EXPLOIT_OUTPUT_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first present key from names."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
-
-
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Exploit Output dataset records to match strict schema.
-    - Always includes normalized CVE ID
-    - Fills missing values with None (DynamoDB NULL)
-    """
-    out: Dict[str, Any] = {}
-
-    # Always include normalized CVE
-    cve = _get_field(record, ["CVE_ID", "CVE", "cve_id", "Name"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
-
-    rename_map = {
-        "Author": "exploit_output_author",
-        "Date": "exploit_output_date",
-        "EDB ID": "exploit_output_edb_id",
-        "Link": "exploit_output_link",
-        "Platform": "exploit_output_platform",
-        "Refined Vulnerability Name": "exploit_output_refined_vulnerability_name",
-        "Type": "exploit_output_type",
-        "Vuln Title": "exploit_output_vuln_title",
-    }
-
-    # Map fields
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # Add provenance
-    out["exploit_output_source"] = "exploit-output"
-
-    # Fill missing columns with None (DynamoDB NULL)
-    for col in EXPLOIT_OUTPUT_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Source field → final column, resolved once at import (iterated per record)
+_EXPLOIT_OUTPUT_RENAME = (
+    ("Author", "exploit_output_author"),
+    ("Date", "exploit_output_date"),
+    ("EDB ID", "exploit_output_edb_id"),
+    ("Link", "exploit_output_link"),
+    ("Platform", "exploit_output_platform"),
+    ("Refined Vulnerability Name", "exploit_output_refined_vulnerability_name"),
+    ("Type", "exploit_output_type"),
+    ("Vuln Title", "exploit_output_vuln_title"),
+)
+
+# CVE header aliases in priority order
+_EXPLOIT_OUTPUT_CVE_KEYS = ("CVE_ID", "CVE", "cve_id", "Name")
+
+# Built once by the shared factory; see _factory.make_transformer()
+_EXPLOIT_OUTPUT_SPEC = dict(
+    final_columns=EXPLOIT_OUTPUT_FINAL_COLUMNS,
+    cve_keys=_EXPLOIT_OUTPUT_CVE_KEYS,
+    rename=_EXPLOIT_OUTPUT_RENAME,
+    source_column="exploit_output_source",
+    source_label="exploit-output",
+    nulls=(None,),
+)
+
+clean_and_rename = make_transformer(**_EXPLOIT_OUTPUT_SPEC)
+
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_EXPLOIT_OUTPUT_SPEC)
@@ -4,8 +4,7 @@ All mapped fields are prefixed with `exploitkit_` to avoid collisions in the fin
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -20,45 +19,28 @@ EXPLOITKIT_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_EXPLOITKIT_RENAME = (
+    ("description", "exploitkit_description"),
+    ("exploit-kits", "exploitkit_kits"),
+    ("last-seen", "exploitkit_last_seen"),
+    ("sources", "exploitkit_sources"),
+)
 
+# CVE header aliases in priority order
+_EXPLOITKIT_CVE_KEYS = ("cve", "CVE", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename ExploitKit dataset records.
-    - Always normalizes CVE.
-    - Fills missing values with None (→ DynamoDB NULL).
-    - Used only for left joins (does not overwrite non-matching CVEs).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_EXPLOITKIT_SPEC = dict(
+    final_columns=EXPLOITKIT_FINAL_COLUMNS,
+    cve_keys=_EXPLOITKIT_CVE_KEYS,
+    rename=_EXPLOITKIT_RENAME,
+    source_column="exploitkit_source",
+    source_label="exploitkit",
+    nulls=(None,),
+)
 
-    # Normalize CVE
-    cve = _get_field(record, ["cve", "CVE", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_EXPLOITKIT_SPEC)
 
-    # Rename fields → prefixed schema
-    rename_map = {
-        "description": "exploitkit_description",
-        "exploit-kits": "exploitkit_kits",
-        "last-seen": "exploitkit_last_seen",
-        "sources": "exploitkit_sources",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # Add provenance marker
-    out["exploitkit_source"] = "exploitkit"
-
-    # Fill missing fields with None (DynamoDB → NULL)
-    for col in EXPLOITKIT_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_EXPLOITKIT_SPEC)
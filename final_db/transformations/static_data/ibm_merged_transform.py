@@ -1,6 +1,9 @@
 import logging
-from typing import Dict, Any, List
-from utils.cve_utils import extract_cves, normalize_cve
+import sys
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+from utils.cve_utils import CVE_PATTERN, extract_cves, normalize_cve_series
+from utils.frame_utils import normalize_headers, rows_with_cve, rename_frame, finalize_frame
 
 log = logging.getLogger(__name__)
 
@@ -41,90 +44,201 @@ IBM_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first valid (non-null) field value from the list of possible names."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Placeholder values the IBM export uses for empty cells
+_IBM_NULLS = (None, "", "null", "NULL")
+# The same placeholders as DataFrame.isin() takes them (None is already missing to pandas)
+_IBM_NULL_MASK = [n for n in _IBM_NULLS if n is not None]
 
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
+@lru_cache(maxsize=None)  # the set of distinct CSV headers is tiny
+def _normalize_header(name: str) -> str:
     """
-    Transform IBM merged record into canonical schema for final table.
-    - Handles multiple CVEs in a single field (joins them into one merged dict)
-    - Normalizes CVEs using extract_cves()
-    - Prefixes mapped fields
-    - Fills missing values with None
-    - Returns a single dict (safe for left_join_loader)
+    Header key used for matching: lowercase, without underscores or spaces.
+    - Interned, like the identifier-style literals in _IBM_RENAME, so the
+      per-record record.get(old) probes hit dict's pointer-equality fast path
     """
+    return sys.intern(name.lower().replace("_", "").replace(" ", ""))
+
+
+# Raw CVE headers in priority order. Probed on the record as exported, not on
+# normalized keys: "CVE" and "cve" (or "CVE_ID" and "cve_id") would otherwise
+# collapse into one key and let the record's key order pick the join CVE.
+_IBM_CVE_KEYS = ("CVE", "CVE_ID", "cve", "cve_id", "vuln_ID_link", "vuln_id_link", "Vuln_ID_Link")
+
+
+def _first(record: Dict[str, Any], keys):
+    """Return the first non-placeholder value among `keys` (plain dict.get per key)."""
+    for k in keys:
+        v = record.get(k)
+        if v not in _IBM_NULLS:
+            return v
+    return None
+
+
+# Source header (normalized, see _normalize_header) → final column, resolved once at import.
+# Case/spacing variants of a header ("Attack_Vector", "Attack Vector", ...) all land on one entry.
+_IBM_RENAME = (
+    ("affectedproducts", "ibm_affected_products"),
+    ("attackcomplexity", "ibm_attack_complexity"),
+    ("attackvector", "ibm_attack_vector"),
+    ("authentication", "ibm_authentication"),
+    ("availabilityimpact", "ibm_availability_impact"),
+    ("collectionlinks", "ibm_collection_links"),
+    ("collections", "ibm_collections"),
+    ("confidentialityimpact", "ibm_confidentiality_impact"),
+    ("consequences", "ibm_consequences"),
+    ("cvss1basescore", "ibm_cvss1_base_score"),
+    ("cvss1temporalscore", "ibm_cvss1_temporal_score"),
+    ("cvss2basescore", "ibm_cvss2_base_score"),
+    ("cvss2temporalscore", "ibm_cvss2_temporal_score"),
+    ("cvss3basescore", "ibm_cvss3_base_score"),
+    ("cvss3temporalscore", "ibm_cvss3_temporal_score"),
+    ("dependentproducts", "ibm_dependent_products"),
+    ("details", "ibm_details"),
+    ("exploitability", "ibm_exploitability"),
+    ("ibmnetworkptotection", "ibm_ibm_network_protection"),
+    ("ibmnetworkprotection", "ibm_ibm_network_protection"),
+    ("integrityimpact", "ibm_integrity_impact"),
+    ("privilegesrequired", "ibm_privileges_required"),
+    ("reflink", "ibm_ref_link"),
+    ("references", "ibm_references"),
+    ("remediationlevel", "ibm_remediation_level"),
+    ("remedy", "ibm_remedy"),
+    ("reportconfidence", "ibm_report_confidence"),
+    ("scope", "ibm_scope"),
+    ("sourcesheet", "ibm_sourcesheet"),
+    ("userinteraction", "ibm_user_interaction"),
+    ("vulname", "ibm_vuln_name"),
+    ("vulnidlink", "ibm_vuln_id_link"),
+)
+
+_IBM_COLUMNS = tuple(IBM_FINAL_COLUMNS)
+
+# Every final column preset to None, provenance marker included — each record
+# starts from one C-level copy with nothing constant left to write
+_IBM_TEMPLATE = {**dict.fromkeys(_IBM_COLUMNS), "ibm_source": "ibm_merged"}
 
-    # ✅ Extract all possible CVEs
-    raw_cve = _get_field(
-        record,
-        ["CVE", "CVE_ID", "cve", "cve_id", "vuln_ID_link", "vuln_id_link", "Vuln_ID_Link"],
-    )
-    cve_list = extract_cves(raw_cve)
 
-    # If no valid CVE found, fallback to None
+def _map_ibm_record(record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Shared core of every IBM output mode.
+    - Returns the mapped row (cve_id still None) and the record's distinct, normalized CVEs
+    - Records without a CVE come back as the bare template
+    """
+    # ✅ Extract all possible CVEs (extract_cves returns them normalized)
+    cve_list = extract_cves(_first(record, _IBM_CVE_KEYS))
+    out: Dict[str, Any] = _IBM_TEMPLATE.copy()
     if not cve_list:
-        cve_list = [None]
-
-    # ✅ Create comma-joined CVE list (safe single field for left join)
-    primary_cve = cve_list[0]
-    joined_cves = ", ".join(cve_list) if len(cve_list) > 1 else primary_cve
-
-    rename_map = {
-        "Affected_Products": "ibm_affected_products",
-        "Attack_Complexity": "ibm_attack_complexity",
-        "Attack_Vector": "ibm_attack_vector",
-        "Authentication": "ibm_authentication",
-        "Availability_Impact": "ibm_availability_impact",
-        "Collection_Links": "ibm_collection_links",
-        "Collections": "ibm_collections",
-        "Confidentiality_Impact": "ibm_confidentiality_impact",
-        "Consequences": "ibm_consequences",
-        "Cvss_1_Base_score": "ibm_cvss1_base_score",
-        "Cvss_1_Temporal_Score": "ibm_cvss1_temporal_score",
-        "Cvss_2_Base_score": "ibm_cvss2_base_score",
-        "Cvss_2_Temporal_Score": "ibm_cvss2_temporal_score",
-        "Cvss_3_Base_score": "ibm_cvss3_base_score",
-        "Cvss_3_Temporal_Score": "ibm_cvss3_temporal_score",
-        "Dependent_Products": "ibm_dependent_products",
-        "Details": "ibm_details",
-        "Exploitability": "ibm_exploitability",
-        "IBM_Network_Ptotection": "ibm_ibm_network_protection",
-        "IBM_Network_Protection": "ibm_ibm_network_protection",
-        "Integrity_Impact": "ibm_integrity_impact",
-        "Privileges_Required": "ibm_privileges_required",
-        "Ref_Link": "ibm_ref_link",
-        "References": "ibm_references",
-        "Remediation_Level": "ibm_remediation_level",
-        "Remedy": "ibm_remedy",
-        "Report_Confidence": "ibm_report_confidence",
-        "Scope": "ibm_scope",
-        "SourceSheet": "ibm_sourcesheet",
-        "User_Interaction": "ibm_user_interaction",
-        "Vul_Name": "ibm_vuln_name",
-        "vuln_ID_link": "ibm_vuln_id_link",
-    }
+        return out, cve_list  # no join key — the loader drops it, skip the rename loop
+
+    # Normalize header variants once for the rename; placeholder cells are dropped on the way
+    record = {_normalize_header(k): v for k, v in record.items() if v not in _IBM_NULLS}
 
     # ✅ Map static fields once
-    out: Dict[str, Any] = {}
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        out[new] = val if val is not None else None
+    for old, new in _IBM_RENAME:
+        val = record.get(old)
+        # placeholders are already gone, so the misspelt Network_Ptotection alias can't be blanked
+        if val is not None:
+            out[new] = val
+    return out, cve_list
 
-    # ✅ Add normalized CVE(s)
-    out["cve_id"] = normalize_cve(primary_cve) if primary_cve else None
-    out["ibm_source"] = "ibm_merged"
 
+def clean_and_rename_explode(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Transform IBM merged record into one canonical row per CVE it names.
+    - Rows share every mapped field and differ only in cve_id
+    - A record without a valid CVE yields a single row with cve_id None
+    - Bulk callers should use clean_and_rename_explode_frame(), which explodes
+      a whole frame column-wise instead of copying a dict per CVE
+    """
+    base, cve_list = _map_ibm_record(record)
+    if not cve_list:
+        return [base]
+    # one dict display per CVE — no copy-then-assign round trip
+    return [{**base, "cve_id": cve} for cve in cve_list]
+
+
+def clean_and_rename_single(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transform IBM merged record into canonical schema for final table.
+    - Handles multiple CVEs in a single field (joins them into one merged dict)
+    - cve_id is the first CVE; the rest are kept in ibm_cve_list
+    - Returns a single dict (safe for left_join_loader)
+    """
+    out, cve_list = _map_ibm_record(record)
+    if cve_list:
+        out["cve_id"] = cve_list[0]
     # If there were multiple CVEs, store them in a combined field for traceability
     if len(cve_list) > 1:
-        out["ibm_cve_list"] = joined_cves  # optional extra field
+        out["ibm_cve_list"] = ", ".join(cve_list)  # optional extra field
+    return out
 
-    # ✅ Fill all missing columns with None
-    for col in IBM_FINAL_COLUMNS:
-        out.setdefault(col, None)
 
-    return out
+_IBM_MODES = {"single": clean_and_rename_single, "explode": clean_and_rename_explode}
+
+
+def clean_and_rename(record: Dict[str, Any], mode: str = "single"):
+    """
+    IBM transform entry point; `mode` picks the output shape.
+    - "single" (default, what left_join_loader expects): one dict per record
+    - "explode": a list with one dict per CVE
+    """
+    return _IBM_MODES[mode](record)
+
+
+clean_and_rename.columns = clean_and_rename_single.columns = (*IBM_FINAL_COLUMNS, "ibm_cve_list")
+clean_and_rename_explode.columns = _IBM_COLUMNS
+
+
+# CVE aliases in the order clean_and_rename() tries them
+_IBM_CVE_ALIASES = tuple((key, "raw_cve") for key in _IBM_CVE_KEYS)
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole IBM merged DataFrame.
+    - cve_id is the first CVE found in the raw field, normalized column-wise
+    - Rows naming several CVEs also get ibm_cve_list ("CVE-A, CVE-B")
+    - One output row per input row with a CVE field, in IBM_FINAL_COLUMNS order (+ ibm_cve_list)
+    """
+    out, cve_lists = _map_ibm_frame(df)
+    if cve_lists is not None:
+        out["cve_id"] = cve_lists.str[0]
+        out["ibm_cve_list"] = cve_lists[cve_lists.str.len() > 1].str.join(", ")
+    return finalize_frame(out, clean_and_rename.columns)
+
+
+def clean_and_rename_explode_frame(df):
+    """
+    Vectorized clean_and_rename_explode() for a whole IBM merged DataFrame.
+    - One output row per CVE (DataFrame.explode), rows without a CVE kept once
+    - Columns in IBM_FINAL_COLUMNS order; the index is reset
+    """
+    out, cve_lists = _map_ibm_frame(df)
+    if cve_lists is not None:
+        out["cve_id"] = cve_lists
+        out = out.explode("cve_id", ignore_index=True)
+    return finalize_frame(out, _IBM_COLUMNS)
+
+
+def _map_ibm_frame(df):
+    """
+    Shared core of the IBM frame variants (column-wise _map_ibm_record).
+    - The CVE field is coalesced from the raw headers (see _IBM_CVE_KEYS);
+      only the rename runs on normalized headers
+    - Rows whose CVE fields are all empty are dropped up front
+    - Returns the mapped frame and, per row, the list of distinct normalized CVEs
+      (missing for rows without any; None when the frame has no CVE column)
+    """
+    df = rows_with_cve(df.mask(df.isin(_IBM_NULL_MASK)), _IBM_CVE_ALIASES)
+    raw = rename_frame(df, _IBM_CVE_ALIASES).get("raw_cve")
+    out = rename_frame(normalize_headers(df, _normalize_header), _IBM_RENAME)
+    out["ibm_source"] = "ibm_merged"
+    if raw is None:
+        return out, None
+
+    # Every CVE per row → normalized, de-duplicated in order of appearance
+    matches = raw.astype("string").str.extractall(CVE_PATTERN)[0]
+    found = normalize_cve_series(matches).set_axis(matches.index.get_level_values(0)).dropna()
+    found = found[~found.reset_index().duplicated().to_numpy()]  # same CVE twice in one row
+    return out, found.groupby(level=0).agg(list).reindex(out.index).astype(object)
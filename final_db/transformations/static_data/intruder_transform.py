@@ -11,7 +11,8 @@ All mapped fields are prefixed with `intruder_`.
 
 import logging
 from typing import Dict, Any
-from utils.cve_utils import normalize_cve
+from utils.cve_utils import normalize_cve, normalize_cve_series
+from utils.frame_utils import rows_with_cve, rename_frame, finalize_frame
 
 log = logging.getLogger(__name__)
 
@@ -40,12 +41,35 @@ INTRUDER_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first present key from names (exact match), or None."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_INTRUDER_RENAME = (
+    ("Plugin ID", "intruder_plugin_id"),
+    ("Base Score", "intruder_base_score"),
+    ("CPE", "intruder_cpe"),
+    ("CVSS2 Vector", "intruder_cvss2_vector"),
+    ("Depandency", "intruder_dependency"),
+    ("Dependency", "intruder_dependency"),  # tolerate alternate spelling
+    ("exclude key", "intruder_exclude_key"),
+    ("Exploit Available", "intruder_exploit_available"),
+    ("Exploit easy", "intruder_exploit_easy"),
+    ("family", "intruder_family"),
+    ("File Name", "intruder_file_name"),
+    ("Port", "intruder_port"),
+    ("Published Date", "intruder_published_date"),
+    ("Reference", "intruder_reference"),
+    ("Required key", "intruder_required_key"),
+    ("Service", "intruder_service"),
+    ("Type", "intruder_type"),
+    ("Updated Date", "intruder_updated_date"),
+    ("Version", "intruder_version"),
+    ("Vuln Title", "intruder_vuln_title"),
+)
+
+_INTRUDER_COLUMNS = tuple(INTRUDER_FINAL_COLUMNS)
+
+# Every final column preset to None, provenance marker included — each record
+# starts from one C-level copy with nothing constant left to write
+_INTRUDER_TEMPLATE = {**dict.fromkeys(_INTRUDER_COLUMNS), "intruder_source": "intruder"}
 
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
@@ -55,45 +79,43 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     - Prefixes all mapped columns with intruder_
     - Fills missing values with None
     """
-    out: Dict[str, Any] = {}
+    out: Dict[str, Any] = _INTRUDER_TEMPLATE.copy()
 
     # CVE — accept several candidate field names
-    raw_cve = _get_field(record, ["CVE ID", "CVE", "CVE_ID", "cve_id", "cve"])
+    raw_cve = (
+        record.get("CVE ID") or record.get("CVE") or record.get("CVE_ID")
+        or record.get("cve_id") or record.get("cve")
+    )
     out["cve_id"] = normalize_cve(raw_cve) if raw_cve else None
+    if out["cve_id"] is None:
+        return out  # no join key — the loader drops it, skip the rename loop
 
-    rename_map = {
-        "Plugin ID": "intruder_plugin_id",
-        "Base Score": "intruder_base_score",
-        "CPE": "intruder_cpe",
-        "CVSS2 Vector": "intruder_cvss2_vector",
-        "Depandency": "intruder_dependency",
-        "Dependency": "intruder_dependency",  # tolerate alternate spelling
-        "exclude key": "intruder_exclude_key",
-        "Exploit Available": "intruder_exploit_available",
-        "Exploit easy": "intruder_exploit_easy",
-        "family": "intruder_family",
-        "File Name": "intruder_file_name",
-        "Port": "intruder_port",
-        "Published Date": "intruder_published_date",
-        "Reference": "intruder_reference",
-        "Required key": "intruder_required_key",
-        "Service": "intruder_service",
-        "Type": "intruder_type",
-        "Updated Date": "intruder_updated_date",
-        "Version": "intruder_version",
-        "Vuln Title": "intruder_vuln_title",
-    }
-
-    for src_name, dst_name in rename_map.items():
-        val = _get_field(record, [src_name])
+    for src_name, dst_name in _INTRUDER_RENAME:
+        val = record.get(src_name)
         if val is not None:
             out[dst_name] = val
 
-    # provenance marker
-    out["intruder_source"] = "intruder"
+    return out
 
-    # ensure all final columns exist (set missing to None)
-    for col in INTRUDER_FINAL_COLUMNS:
-        out.setdefault(col, None)
 
-    return out
+clean_and_rename.columns = _INTRUDER_COLUMNS
+
+
+# CVE aliases in the order clean_and_rename() tries them
+_INTRUDER_CVE_ALIASES = (
+    ("CVE ID", "cve_id"), ("CVE", "cve_id"), ("CVE_ID", "cve_id"), ("cve_id", "cve_id"), ("cve", "cve_id"),
+)
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole Intruder DataFrame (e.g. the source CSV).
+    - CVEs are normalized column-wise with a single regex extract
+    - One output row per input row that carries a CVE, in INTRUDER_FINAL_COLUMNS order
+    """
+    df = rows_with_cve(df, _INTRUDER_CVE_ALIASES)
+    out = rename_frame(df, _INTRUDER_CVE_ALIASES + _INTRUDER_RENAME)
+    if "cve_id" in out:
+        out["cve_id"] = normalize_cve_series(out["cve_id"])
+    out["intruder_source"] = "intruder"
+    return finalize_frame(out, _INTRUDER_COLUMNS)
@@ -22,12 +22,15 @@ Example output:
         "exploit_kits": None,
         "ransomware": "Hidden Tear -- Ransomware",
         "uploaded_date": "2025-10-30",
-        "vulnerabilities": None
+        "vulnerabilities": None,
+        "s_no": "228"
     }
 """
 
 import logging
-from typing import Dict, Any, List, Iterable
+import string
+from typing import Dict, Any, List, Iterable, Iterator
+from utils.frame_utils import rename_frame, finalize_frame, map_frame_chunks
 
 log = logging.getLogger(__name__)
 
@@ -42,26 +45,28 @@ MCAFEE_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names) -> Any:
-    """Return the first present value for any of the given names."""
-    if isinstance(names, str):
-        names = [names]
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# String placeholders for empty cells; only str values are probed, so list/map cells never get hashed
+_NULL_STRINGS = frozenset(("", "null", "NULL"))
+
+
+# Whitespace and both quote styles, stripped from the ends in one pass
+_STRIP_CHARS = string.whitespace + "\"'"
+_NULL_TOKENS = frozenset(("null", ""))
+
+
+def _clean_text(v: str) -> Any:
+    s = v.strip(_STRIP_CHARS)
+    return None if s.lower() in _NULL_TOKENS else s
+
+
+# Cleaner per exact value type; anything else (None, Decimal, lists, maps) passes through
+_CLEANERS = {str: _clean_text}
 
 
 def _clean_str(v: Any) -> Any:
     """Trim and convert 'null' strings to None."""
-    if v is None:
-        return None
-    if isinstance(v, str):
-        s = v.strip().strip('"').strip("'")
-        if s.lower() == "null" or s == "":
-            return None
-        return s
-    return v
+    cleaner = _CLEANERS.get(type(v))
+    return cleaner(v) if cleaner else v
 
 
 RENAME_MAP = {
@@ -73,33 +78,91 @@ RENAME_MAP = {
     "Vulnerabilities": "vulnerabilities",
 }
 
+# RENAME_MAP as the (source, column) pairs rename_frame() takes, built once
+_RENAME_PAIRS = tuple(RENAME_MAP.items())
+
+_MCAFEE_COLUMNS = tuple(MCAFEE_FINAL_COLUMNS)
+# Row shape of both paths: the final schema plus the source serial number. s_no is
+# always emitted (None when absent) so the row and frame paths agree at any batch size.
+_MCAFEE_OUTPUT_COLUMNS = (*_MCAFEE_COLUMNS, "s_no")
+# Every output column preset to None (cve_id included: this dataset carries no CVEs);
+# each record starts from one C-level copy
+_MCAFEE_TEMPLATE = dict.fromkeys(_MCAFEE_OUTPUT_COLUMNS)
+
 
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Clean and normalize a McAfee dataset record.
     Since this dataset doesn’t contain CVEs, cve_id is kept as None.
     """
-    out: Dict[str, Any] = {}
-
-    # Set CVE ID (static dataset → no CVEs)
-    out["cve_id"] = None
+    out: Dict[str, Any] = _MCAFEE_TEMPLATE.copy()
 
-    for src, dest in RENAME_MAP.items():
-        val = _get_field(record, src)
-        if val is not None:
+    for src, dest in _RENAME_PAIRS:
+        val = record.get(src)
+        if val is not None and not (isinstance(val, str) and val in _NULL_STRINGS):
             out[dest] = _clean_str(val)
 
-    # Fill missing columns with None
-    for col in MCAFEE_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
     return out
 
 
+clean_and_rename.columns = _MCAFEE_COLUMNS
+
+
+def _clean_str_series(col):
+    """Column-wise _clean_str(): strings are trimmed, 'null'/'' become NaN, other values pass through."""
+    cleaned = col.str.strip(_STRIP_CHARS)  # non-strings come back NaN
+    is_str = cleaned.notna()
+    cleaned = cleaned.mask(cleaned.str.lower().eq("null") | cleaned.eq(""))
+    return cleaned.where(is_str, col)
+
+
+def clean_and_rename_frame(df):
+    """
+    Vectorized clean_and_rename() for a whole McAfee DataFrame.
+    - String cells are cleaned column-wise (one .str pass per column, not per cell)
+    - One output row per input row, in MCAFEE_FINAL_COLUMNS order plus s_no
+    """
+    out = rename_frame(df, _RENAME_PAIRS)
+    for col in out.columns:
+        if out[col].dtype.kind == "O":  # object or string dtype
+            out[col] = _clean_str_series(out[col])
+    return finalize_frame(out, _MCAFEE_OUTPUT_COLUMNS)  # cve_id is never produced → all None
+
+
+# Below this many records the DataFrame round trip costs more than it saves
+VECTORIZE_MIN_ROWS = 500
+# From this many records on, frame chunks are transformed on a process pool
+PARALLEL_MIN_ROWS = 10_000
+
+
+def iter_transformed(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of transform_batch(): yields one transformed record at a time.
+    - Pair with parallel_scan_iter() so neither the scan nor its output is held in memory
+    """
+    for r in records:
+        yield clean_and_rename(r)
+
+
 def transform_batch(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Transform all McAfee records into the strict final schema."""
-    transformed = [clean_and_rename(r) for r in records]
-    log.info("Transformed %d McAfee static records", len(transformed))
+    """
+    Transform all McAfee records into the strict final schema.
+    - Batches of VECTORIZE_MIN_ROWS or more go through clean_and_rename_frame()
+    - Batches of PARALLEL_MIN_ROWS or more are split across processes (map_frame_chunks)
+    """
+    records = list(records)
+    if len(records) < VECTORIZE_MIN_ROWS:
+        transformed = list(iter_transformed(records))
+    else:
+        import pandas as pd
+
+        df = pd.DataFrame.from_records(records)
+        if len(records) < PARALLEL_MIN_ROWS:
+            transformed = clean_and_rename_frame(df).to_dict("records")
+        else:
+            transformed = map_frame_chunks(df, clean_and_rename_frame).to_dict("records")
+    if log.isEnabledFor(logging.INFO):  # called per chunk; skip the record when INFO is off
+        log.info("Transformed %d McAfee static records", len(transformed))
     return transformed
 
 
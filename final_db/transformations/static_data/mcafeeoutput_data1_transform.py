@@ -4,8 +4,7 @@ All mapped fields are prefixed with `mcafee_` to avoid collisions in the final m
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -19,44 +18,26 @@ MCAFEE_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_MCAFEE_RENAME = (
+    ("Campaign", "mcafee1_campaign"),
+    ("Exploit kits", "mcafee1_exploit_kits"),
+    ("Ransomware", "mcafee1_ransomware"),
+)
 
+# CVE header aliases in priority order
+_MCAFEE_CVE_KEYS = ("Vulnerabilities", "vulnerabilities", "CVE", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename McAfee dataset records.
-    - Extracts and normalizes CVE from 'Vulnerabilities' column.
-    - Prefixes all mapped fields with `mcafee_`.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_MCAFEE_SPEC = dict(
+    final_columns=MCAFEE_FINAL_COLUMNS,
+    cve_keys=_MCAFEE_CVE_KEYS,
+    rename=_MCAFEE_RENAME,
+    source_column="mcafee1_source",
+    source_label="mcafee1_output",
+)
 
-    # ✅ Extract CVE from 'Vulnerabilities' column
-    cve = _get_field(record, ["Vulnerabilities", "vulnerabilities", "CVE", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_MCAFEE_SPEC)
 
-    # ✅ Rename fields → prefixed schema
-    rename_map = {
-        "Campaign": "mcafee1_campaign",
-        "Exploit kits": "mcafee1_exploit_kits",
-        "Ransomware": "mcafee1_ransomware",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["mcafee1_source"] = "mcafee1_output"
-
-    # ✅ Fill missing fields with None
-    for col in MCAFEE_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_MCAFEE_SPEC)
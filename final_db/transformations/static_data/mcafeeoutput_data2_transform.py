@@ -4,8 +4,7 @@ All mapped fields are prefixed with `mcafee2_` to avoid collisions in the final
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ Ensures consistent CVE formatting (e.g., CVE-2020-1234)
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -20,45 +19,27 @@ MCAFEE2_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_MCAFEE2_RENAME = (
+    ("Campaign", "mcafee2_campaign"),
+    ("Description", "mcafee2_description"),
+    ("Exploit kits", "mcafee2_exploit_kits"),
+    ("Ransomware", "mcafee2_ransomware"),
+)
 
+# CVE header aliases in priority order
+_MCAFEE2_CVE_KEYS = ("Vulnerabilities", "vulnerabilities", "CVE", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename McAfee Output Data 2 records.
-    - Normalizes CVE IDs from 'Vulnerabilities' column.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_MCAFEE2_SPEC = dict(
+    final_columns=MCAFEE2_FINAL_COLUMNS,
+    cve_keys=_MCAFEE2_CVE_KEYS,
+    rename=_MCAFEE2_RENAME,
+    source_column="mcafee2_source",
+    source_label="mcafee_output_data2",
+)
 
-    # ✅ Extract and normalize CVE ID
-    cve = _get_field(record, ["Vulnerabilities", "vulnerabilities", "CVE", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_MCAFEE2_SPEC)
 
-    # ✅ Map → prefixed schema
-    rename_map = {
-        "Campaign": "mcafee2_campaign",
-        "Description": "mcafee2_description",
-        "Exploit kits": "mcafee2_exploit_kits",
-        "Ransomware": "mcafee2_ransomware",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["mcafee2_source"] = "mcafee_output_data2"
-
-    # ✅ Fill missing columns with None
-    for col in MCAFEE2_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_MCAFEE2_SPEC)
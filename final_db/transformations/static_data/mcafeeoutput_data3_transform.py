@@ -4,8 +4,7 @@ All mapped fields are prefixed with `mcafee3_` to avoid collisions in the final
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -18,43 +17,25 @@ MCAFEE3_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_MCAFEE3_RENAME = (
+    ("Exploit kits", "mcafee3_exploit_kits"),
+    ("Ransomware", "mcafee3_ransomware"),
+)
 
+# CVE header aliases in priority order
+_MCAFEE3_CVE_KEYS = ("CVE", "cve", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename McAfee Output Data 3 records.
-    - Normalizes CVE IDs from 'CVE' column.
-    - Prefixes all mapped fields with `mcafee3_`.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_MCAFEE3_SPEC = dict(
+    final_columns=MCAFEE3_FINAL_COLUMNS,
+    cve_keys=_MCAFEE3_CVE_KEYS,
+    rename=_MCAFEE3_RENAME,
+    source_column="mcafee3_source",
+    source_label="mcafee_output_data3",
+)
 
-    # ✅ Normalize CVE ID
-    cve = _get_field(record, ["CVE", "cve", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_MCAFEE3_SPEC)
 
-    # ✅ Rename map → prefixed schema
-    rename_map = {
-        "Exploit kits": "mcafee3_exploit_kits",
-        "Ransomware": "mcafee3_ransomware",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["mcafee3_source"] = "mcafee_output_data3"
-
-    # ✅ Fill missing columns with None
-    for col in MCAFEE3_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_MCAFEE3_SPEC)
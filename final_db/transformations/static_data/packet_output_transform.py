@@ -4,8 +4,8 @@ All mapped fields are prefixed with `packet_` to avoid collisions in the final t
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # normalize CVE-YYYY-NNNN
+from utils.cve_utils import normalize_cve_trusted
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -28,56 +28,38 @@ PACKET_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first present key from names (case-sensitive)."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_PACKET_RENAME = (
+    ("base_score", "packet_base_score"),
+    ("cpes", "packet_cpes"),
+    ("cv3Attackvector", "packet_cv3_attackvector"),
+    ("CV3BaseScore", "packet_cv3_basescore"),
+    ("cwe", "packet_cwe"),
+    ("Exploit_links", "packet_exploit_links"),
+    ("NVD Modified Date", "packet_nvd_modified_date"),
+    ("NVD Published Date", "packet_nvd_published_date"),
+    ("product", "packet_product"),
+    ("vector_string", "packet_vector_string"),
+    ("vendor", "packet_vendor"),
+    ("version", "packet_version"),
+)
 
+# CVE header aliases in priority order
+_PACKET_CVE_KEYS = ("cve_id", "CVE_ID", "CVE", "Name")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Packet Output dataset records to match strict schema.
-    - Always includes normalized CVE
-    - Fills missing values with None
-    - All mapped fields are prefixed with packet_
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_PACKET_SPEC = dict(
+    final_columns=PACKET_FINAL_COLUMNS,
+    cve_keys=_PACKET_CVE_KEYS,
+    rename=_PACKET_RENAME,
+    source_column="packet_source",
+    source_label="packet-output",
+    nulls=(None,),
+    strip_strings=True,  # trim whitespace/quotes off mapped string values
+)
 
-    # Normalize CVE ID
-    raw_cve = _get_field(record, ["cve_id", "CVE_ID", "CVE", "Name"])
-    out["cve_id"] = normalize_cve(raw_cve) if raw_cve else None
+# CVEs arrive canonical from the NVD-joined upstream, so the row path skips re-normalizing
+clean_and_rename = make_transformer(**_PACKET_SPEC, normalize=normalize_cve_trusted)
 
-    rename_map = {
-        "base_score": "packet_base_score",
-        "cpes": "packet_cpes",
-        "cv3Attackvector": "packet_cv3_attackvector",
-        "CV3BaseScore": "packet_cv3_basescore",
-        "cwe": "packet_cwe",
-        "Exploit_links": "packet_exploit_links",
-        "NVD Modified Date": "packet_nvd_modified_date",
-        "NVD Published Date": "packet_nvd_published_date",
-        "product": "packet_product",
-        "vector_string": "packet_vector_string",
-        "vendor": "packet_vendor",
-        "version": "packet_version",
-    }
-
-    # Apply renames
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            # Clean string fields — strip quotes, whitespace
-            if isinstance(val, str):
-                val = val.strip().strip('"').strip("'")
-            out[new] = val
-
-    # Add provenance marker
-    out["packet_source"] = "packet-output"
-
-    # Fill missing columns with None (→ DynamoDB NULL)
-    for col in PACKET_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_PACKET_SPEC)
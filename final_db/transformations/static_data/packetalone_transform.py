@@ -4,8 +4,8 @@ All mapped fields are prefixed with `packetalone_` to avoid collisions in the fi
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from utils.cve_utils import normalize_cve_trusted
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -28,53 +28,37 @@ PACKETALONE_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record:
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_PACKETALONE_RENAME = (
+    ("base_score", "packetalone_base_score"),
+    ("cpes", "packetalone_cpes"),
+    ("cv3Attackvector", "packetalone_cv3_attack_vector"),
+    ("CV3BaseScore", "packetalone_cv3_base_score"),
+    ("cwe", "packetalone_cwe"),
+    ("Exploit_links", "packetalone_exploit_links"),
+    ("NVD Modified Date", "packetalone_nvd_modified_date"),
+    ("NVD Published Date", "packetalone_nvd_published_date"),
+    ("product", "packetalone_product"),
+    ("vector_string", "packetalone_vector_string"),
+    ("vendor", "packetalone_vendor"),
+    ("version", "packetalone_version"),
+)
 
+# CVE header aliases in priority order
+_PACKETALONE_CVE_KEYS = ("cve_id", "CVE")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Packetalone dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_PACKETALONE_SPEC = dict(
+    final_columns=PACKETALONE_FINAL_COLUMNS,
+    cve_keys=_PACKETALONE_CVE_KEYS,
+    rename=_PACKETALONE_RENAME,
+    source_column="packetalone_source",
+    source_label="packetalone",
+    nulls=(None, "null"),
+)
 
-    # Normalize CVE
-    cve = _get_field(record, ["cve_id", "CVE"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+# CVEs arrive canonical from the NVD-joined upstream, so the row path skips re-normalizing
+clean_and_rename = make_transformer(**_PACKETALONE_SPEC, normalize=normalize_cve_trusted)
 
-    # Map → prefixed schema
-    rename_map = {
-        "base_score": "packetalone_base_score",
-        "cpes": "packetalone_cpes",
-        "cv3Attackvector": "packetalone_cv3_attack_vector",
-        "CV3BaseScore": "packetalone_cv3_base_score",
-        "cwe": "packetalone_cwe",
-        "Exploit_links": "packetalone_exploit_links",
-        "NVD Modified Date": "packetalone_nvd_modified_date",
-        "NVD Published Date": "packetalone_nvd_published_date",
-        "product": "packetalone_product",
-        "vector_string": "packetalone_vector_string",
-        "vendor": "packetalone_vendor",
-        "version": "packetalone_version",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None and val != "null":
-            out[new] = val
-
-    # Add provenance marker
-    out["packetalone_source"] = "packetalone"
-
-    # Fill missing columns with None
-    for col in PACKETALONE_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_PACKETALONE_SPEC)
@@ -1,7 +1,7 @@
 import re
 import copy
 import logging
-from typing import Dict, Any, List, Iterable, Optional
+from typing import Dict, Any, List, Iterable, Iterator, Optional
 from utils.cve_utils import normalize_cve
 
 log = logging.getLogger(__name__)
@@ -24,6 +24,25 @@ PACKETSTORM_FINAL_COLUMNS = [
     "packetstorm_source",  # provenance marker
 ]
 
+# Source field → final column, resolved once at import (iterated per record)
+_PACKETSTORM_RENAME = (
+    ("Advisories", "packetstorm_advisories"),
+    ("Author", "packetstorm_author"),
+    ("Description", "packetstorm_description"),
+    ("MD5", "packetstorm_md5"),
+    ("Posted Date", "packetstorm_posted_date"),
+    ("Site", "packetstorm_site"),
+    ("Systems", "packetstorm_systems"),
+    ("Tags", "packetstorm_tags"),
+    ("Title", "packetstorm_title"),
+)
+
+_PACKETSTORM_COLUMNS = tuple(PACKETSTORM_FINAL_COLUMNS)
+
+# Every final column preset to None, provenance marker included — each record
+# starts from one C-level copy with nothing constant left to write
+_PACKETSTORM_TEMPLATE = {**dict.fromkeys(_PACKETSTORM_COLUMNS), "packetstorm_source": "packetstorm"}
+
 def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compatibility wrapper — returns a single record for loader.
@@ -35,6 +54,9 @@ def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
     return exploded[0] if exploded else {}
 
 
+clean_and_rename.columns = _PACKETSTORM_COLUMNS
+
+
 def extract_cves_from_field(value: Any) -> List[str]:
     """Extract and normalize all CVE identifiers from a string value."""
     if value is None:
@@ -71,58 +93,46 @@ def explode_and_map_packetstorm(record: Dict[str, Any]) -> List[Dict[str, Any]]:
     if not cve_list:
         cve_list = [None]
 
-    # Step 2️⃣ — Map original → prefixed schema
-    rename_map = {
-        "Advisories": "packetstorm_advisories",
-        "Author": "packetstorm_author",
-        "Description": "packetstorm_description",
-        "MD5": "packetstorm_md5",
-        "Posted Date": "packetstorm_posted_date",
-        "Site": "packetstorm_site",
-        "Systems": "packetstorm_systems",
-        "Tags": "packetstorm_tags",
-        "Title": "packetstorm_title",
-    }
-
-    # Step 3️⃣ — Build base mapped record (without CVE)
-    base = {}
-    for old, new in rename_map.items():
+    # Step 2️⃣ — Build base mapped record (without CVE) on the prebuilt template
+    base = _PACKETSTORM_TEMPLATE.copy()
+    for old, new in _PACKETSTORM_RENAME:
         val = record.get(old)
         if val is not None and str(val).strip().lower() != "null":
             base[new] = val
-        else:
-            base[new] = None
-
-    # Add provenance marker
-    base["packetstorm_source"] = "packetstorm"
 
-    # Step 4️⃣ — Explode into one record per CVE
+    # Step 3️⃣ — Explode into one record per CVE
     exploded_records = []
     for cve in cve_list:
         row = copy.deepcopy(base)
         row["cve_id"] = normalize_cve(cve) if cve else None
-
-        # Fill all missing final columns
-        for col in PACKETSTORM_FINAL_COLUMNS:
-            row.setdefault(col, None)
-
         exploded_records.append(row)
 
     return exploded_records
 
 
-def transform_packetstorm_batch(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def iter_packetstorm_transformed(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     """
-    Transform and explode a batch of Packetstorm records into a flattened, prefixed schema.
-    Returns a clean list of rows with one CVE per record.
+    Streaming variant of transform_packetstorm_batch().
+    - Yields exploded rows as records arrive, so a scan can be written out
+      without holding every input and output row in memory at once
+    - Records that fail to transform are logged and skipped
     """
-    out = []
     for i, rec in enumerate(records):
         try:
             exploded = explode_and_map_packetstorm(rec)
-            out.extend(exploded)
         except Exception as e:
             log.exception("Failed to process Packetstorm record index %s: %s", i, e)
-    log.info("Packetstorm: input rows=%d -> exploded rows=%d", len(list(records)), len(out))
+            continue
+        yield from exploded
+
+
+def transform_packetstorm_batch(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Transform and explode a batch of Packetstorm records into a flattened, prefixed schema.
+    Returns a clean list of rows with one CVE per record.
+    """
+    records = list(records)  # counted below; a generator would already be spent
+    out = list(iter_packetstorm_transformed(records))
+    log.info("Packetstorm: input rows=%d -> exploded rows=%d", len(records), len(out))
     return out
 
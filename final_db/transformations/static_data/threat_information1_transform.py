@@ -4,8 +4,7 @@ All mapped fields are prefixed with `threatinfo_` to avoid collisions in the fin
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -17,42 +16,24 @@ THREATINFO_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_THREATINFO_RENAME = (
+    ("APT group", "threatinfo1_apt_group"),
+)
 
+# CVE header aliases in priority order
+_THREATINFO_CVE_KEYS = ("CVE", "cve", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Threat Information dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_THREATINFO_SPEC = dict(
+    final_columns=THREATINFO_FINAL_COLUMNS,
+    cve_keys=_THREATINFO_CVE_KEYS,
+    rename=_THREATINFO_RENAME,
+    source_column="threatinfo1_source",
+    source_label="threat_information1",
+)
 
-    # ✅ Normalize CVE ID
-    cve = _get_field(record, ["CVE", "cve", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_THREATINFO_SPEC)
 
-    # ✅ Map → prefixed schema
-    rename_map = {
-        "APT group": "threatinfo1_apt_group",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["threatinfo1_source"] = "threat_information1"
-
-    # ✅ Fill missing columns with None
-    for col in THREATINFO_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_THREATINFO_SPEC)
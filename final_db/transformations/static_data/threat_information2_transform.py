@@ -4,8 +4,7 @@ All mapped fields are prefixed with `threatinfo2_` to avoid collisions in the fi
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting (e.g., CVE-2020-1234)
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -18,43 +17,25 @@ THREATINFO2_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_THREATINFO2_RENAME = (
+    ("ransomware", "threatinfo2_ransomware"),
+    ("Associated ExploitKit", "threatinfo2_associated_exploitkit"),
+)
 
+# CVE header aliases in priority order
+_THREATINFO2_CVE_KEYS = ("cve", "CVE", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Threat Information 2 dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_THREATINFO2_SPEC = dict(
+    final_columns=THREATINFO2_FINAL_COLUMNS,
+    cve_keys=_THREATINFO2_CVE_KEYS,
+    rename=_THREATINFO2_RENAME,
+    source_column="threatinfo2_source",
+    source_label="threat_information_2",
+)
 
-    # ✅ Normalize CVE ID
-    cve = _get_field(record, ["cve", "CVE", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_THREATINFO2_SPEC)
 
-    # ✅ Rename map → prefixed schema
-    rename_map = {
-        "ransomware": "threatinfo2_ransomware",
-        "Associated ExploitKit": "threatinfo2_associated_exploitkit",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["threatinfo2_source"] = "threat_information_2"
-
-    # ✅ Fill missing columns with None
-    for col in THREATINFO2_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_THREATINFO2_SPEC)
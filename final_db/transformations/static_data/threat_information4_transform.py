@@ -4,8 +4,7 @@ All mapped fields are prefixed with `threatinfo4_` to avoid collisions in the fi
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -18,43 +17,25 @@ THREATINFO4_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_THREATINFO4_RENAME = (
+    ("Ransomware", "threatinfo4_ransomware"),
+    ("Exploit kits", "threatinfo4_exploit_kits"),
+)
 
+# CVE header aliases in priority order
+_THREATINFO4_CVE_KEYS = ("CVE", "cve", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Threat Information 4 dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_THREATINFO4_SPEC = dict(
+    final_columns=THREATINFO4_FINAL_COLUMNS,
+    cve_keys=_THREATINFO4_CVE_KEYS,
+    rename=_THREATINFO4_RENAME,
+    source_column="threatinfo4_source",
+    source_label="threat_information_4",
+)
 
-    # ✅ Normalize CVE ID
-    cve = _get_field(record, ["CVE", "cve", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_THREATINFO4_SPEC)
 
-    # ✅ Map → prefixed schema
-    rename_map = {
-        "Ransomware": "threatinfo4_ransomware",
-        "Exploit kits": "threatinfo4_exploit_kits",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["threatinfo4_source"] = "threat_information_4"
-
-    # ✅ Fill missing columns with None
-    for col in THREATINFO4_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_THREATINFO4_SPEC)
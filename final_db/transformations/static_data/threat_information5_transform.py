@@ -4,8 +4,7 @@ All mapped fields are prefixed with `threatinfo5_` to avoid collisions in the fi
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ ensures consistent CVE formatting like CVE-2020-1234
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -24,49 +23,31 @@ THREATINFO5_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
-
-
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Threat Information 5 dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields.
-    - Fills missing fields with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
-
-    # ✅ Normalize CVE ID
-    cve = _get_field(record, ["CVE", "cve", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
-
-    # ✅ Map → prefixed schema
-    rename_map = {
-        "Ransomware": "threatinfo5_ransomware",
-        "APT Group": "threatinfo5_apt_group",
-        "CWE": "threatinfo5_cwe",
-        "Exploit Kit": "threatinfo5_exploit_kit",
-        "Exploit Type": "threatinfo5_exploit_type",
-        "Family": "threatinfo5_family",
-        "Ransomware CVE Association": "threatinfo5_ransomware_cve_association",
-        "Source": "threatinfo5_source_url",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["threatinfo5_source"] = "threat_information_5"
-
-    # ✅ Fill missing columns with None
-    for col in THREATINFO5_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Source field → final column, resolved once at import (iterated per record)
+_THREATINFO5_RENAME = (
+    ("Ransomware", "threatinfo5_ransomware"),
+    ("APT Group", "threatinfo5_apt_group"),
+    ("CWE", "threatinfo5_cwe"),
+    ("Exploit Kit", "threatinfo5_exploit_kit"),
+    ("Exploit Type", "threatinfo5_exploit_type"),
+    ("Family", "threatinfo5_family"),
+    ("Ransomware CVE Association", "threatinfo5_ransomware_cve_association"),
+    ("Source", "threatinfo5_source_url"),
+)
+
+# CVE header aliases in priority order
+_THREATINFO5_CVE_KEYS = ("CVE", "cve", "cve_id")
+
+# Built once by the shared factory; see _factory.make_transformer()
+_THREATINFO5_SPEC = dict(
+    final_columns=THREATINFO5_FINAL_COLUMNS,
+    cve_keys=_THREATINFO5_CVE_KEYS,
+    rename=_THREATINFO5_RENAME,
+    source_column="threatinfo5_source",
+    source_label="threat_information_5",
+)
+
+clean_and_rename = make_transformer(**_THREATINFO5_SPEC)
+
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_THREATINFO5_SPEC)
@@ -4,8 +4,7 @@ All mapped fields are prefixed with `top10ransomware_` to avoid collisions in th
 """
 
 import logging
-from typing import Dict, Any
-from utils.cve_utils import normalize_cve  # ✅ Ensures consistent CVE formatting (e.g., CVE-2020-1234)
+from transformations.static_data._factory import make_transformer, make_frame_transformer
 
 log = logging.getLogger(__name__)
 
@@ -42,67 +41,49 @@ TOP10RANSOMWARE_FINAL_COLUMNS = [
 ]
 
 
-def _get_field(record: Dict[str, Any], names):
-    """Return the first matching field value (case-insensitive, safe lookup)."""
-    for n in names:
-        if n in record and record[n] not in (None, "", "null", "NULL"):
-            return record[n]
-    return None
+# Source field → final column, resolved once at import (iterated per record)
+_TOP10RANSOMWARE_RENAME = (
+    ("Associated Ransomware", "top10ransomware_associated_ransomware"),
+    ("Associated threat groups", "top10ransomware_associated_threat_groups"),
+    ("Attack date", "top10ransomware_attack_date"),
+    ("Attack methods", "top10ransomware_attack_methods"),
+    ("CVSSV2 Score", "top10ransomware_cvssv2_score"),
+    ("CVSSV2 Vector", "top10ransomware_cvssv2_vector"),
+    ("CVSSV3 score", "top10ransomware_cvssv3_score"),
+    ("CVSSV3 vector", "top10ransomware_cvssv3_vector"),
+    ("CWE", "top10ransomware_cwe"),
+    ("Description", "top10ransomware_description"),
+    ("Encryption", "top10ransomware_encryption"),
+    ("Exploit kit", "top10ransomware_exploit_kit"),
+    ("File extension", "top10ransomware_file_extension"),
+    ("Industry Targeted", "top10ransomware_industry_targeted"),
+    ("IOCs", "top10ransomware_iocs"),
+    ("Originated year", "top10ransomware_originated_year"),
+    ("Other Names", "top10ransomware_other_names"),
+    ("Product", "top10ransomware_product"),
+    ("Ransome Demand", "top10ransomware_ransom_demand"),
+    ("Ransomware", "top10ransomware_ransomware"),
+    ("Recent Attack", "top10ransomware_recent_attack"),
+    ("Recommendation", "top10ransomware_recommendation"),
+    ("References", "top10ransomware_references"),
+    ("Targeted Countries", "top10ransomware_targeted_countries"),
+    ("Vendor", "top10ransomware_vendor"),
+    ("Vulnerabilities", "top10ransomware_vulnerabilities"),
+)
 
+# CVE header aliases in priority order
+_TOP10RANSOMWARE_CVE_KEYS = ("CVE", "cve", "cve_id")
 
-def clean_and_rename(record: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Clean and rename Top10 Ransomware dataset records.
-    - Normalizes CVE IDs.
-    - Prefixes all mapped fields to prevent name collisions.
-    - Fills missing values with None (→ DynamoDB NULL).
-    """
-    out: Dict[str, Any] = {}
+# Built once by the shared factory; see _factory.make_transformer()
+_TOP10RANSOMWARE_SPEC = dict(
+    final_columns=TOP10RANSOMWARE_FINAL_COLUMNS,
+    cve_keys=_TOP10RANSOMWARE_CVE_KEYS,
+    rename=_TOP10RANSOMWARE_RENAME,
+    source_column="top10ransomware_source",
+    source_label="top10_ransomware",
+)
 
-    # ✅ Normalize CVE
-    cve = _get_field(record, ["CVE", "cve", "cve_id"])
-    out["cve_id"] = normalize_cve(cve) if cve else None
+clean_and_rename = make_transformer(**_TOP10RANSOMWARE_SPEC)
 
-    # ✅ Rename map → prefixed schema
-    rename_map = {
-        "Associated Ransomware": "top10ransomware_associated_ransomware",
-        "Associated threat groups": "top10ransomware_associated_threat_groups",
-        "Attack date": "top10ransomware_attack_date",
-        "Attack methods": "top10ransomware_attack_methods",
-        "CVSSV2 Score": "top10ransomware_cvssv2_score",
-        "CVSSV2 Vector": "top10ransomware_cvssv2_vector",
-        "CVSSV3 score": "top10ransomware_cvssv3_score",
-        "CVSSV3 vector": "top10ransomware_cvssv3_vector",
-        "CWE": "top10ransomware_cwe",
-        "Description": "top10ransomware_description",
-        "Encryption": "top10ransomware_encryption",
-        "Exploit kit": "top10ransomware_exploit_kit",
-        "File extension": "top10ransomware_file_extension",
-        "Industry Targeted": "top10ransomware_industry_targeted",
-        "IOCs": "top10ransomware_iocs",
-        "Originated year": "top10ransomware_originated_year",
-        "Other Names": "top10ransomware_other_names",
-        "Product": "top10ransomware_product",
-        "Ransome Demand": "top10ransomware_ransom_demand",
-        "Ransomware": "top10ransomware_ransomware",
-        "Recent Attack": "top10ransomware_recent_attack",
-        "Recommendation": "top10ransomware_recommendation",
-        "References": "top10ransomware_references",
-        "Targeted Countries": "top10ransomware_targeted_countries",
-        "Vendor": "top10ransomware_vendor",
-        "Vulnerabilities": "top10ransomware_vulnerabilities",
-    }
-
-    for old, new in rename_map.items():
-        val = _get_field(record, [old])
-        if val is not None:
-            out[new] = val
-
-    # ✅ Add provenance marker
-    out["top10ransomware_source"] = "top10_ransomware"
-
-    # ✅ Fill missing fields
-    for col in TOP10RANSOMWARE_FINAL_COLUMNS:
-        out.setdefault(col, None)
-
-    return out
+# Vectorized clean_and_rename() for a whole DataFrame (e.g. the source CSV)
+clean_and_rename_frame = make_frame_transformer(**_TOP10RANSOMWARE_SPEC)
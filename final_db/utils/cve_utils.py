@@ -1,20 +1,97 @@
 # utils/cve_utils.py
 import re
+import threading
+from functools import lru_cache
+
+try:  # optional: Hyperscan (SIMD DFA) for bulk scans of long free-text fields
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 # ✅ Matches one or more CVEs anywhere in a text string
 CVE_PATTERN = re.compile(r"(?i)(CVE[-_\s]?\d{4}[-_\s]?\d{4,7})")
 
+# Compiled once: normalize_cve runs for every record in the join hot path
+_CVE_PARTS_RE = re.compile(r"(?i)cve[-_\s]?(\d{4})[-_\s]?(\d{4,7})")
+
+# The same CVE recurs across NVD and every joined source, so results are memoized.
+# Bounded so a one-off backfill over free-text fields can't grow the cache forever.
+CVE_CACHE_SIZE = 200_000
+
+# Hyperscan pays off on long descriptive text; short cells stay on `re`
+HS_MIN_LENGTH = 256
+
+_HS_DB = None
+_HS_LOCK = threading.Lock()  # one scratch space per database → serialize scans
+if hyperscan is not None:
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        expressions=[rb"CVE[-_\s]?\d{4}[-_\s]?\d{4,7}"],
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST],
+    )
+
+
 def normalize_cve(value: str | None) -> str | None:
-    """Normalize a single CVE string into 'CVE-YYYY-NNNN' format."""
+    """
+    Normalize a single CVE string into 'CVE-YYYY-NNNN' format.
+    - Memoized per distinct string (CVE_CACHE_SIZE entries, LRU), so a CVE
+      repeated across thousands of records is parsed once
+    - Non-string values are rejected before the cache: Dynamo cells can be
+      unhashable lists/maps, which an lru_cache on this function would choke on
+    """
     if not value or not isinstance(value, str):
         return None
-    value = value.strip()
-    match = re.search(r"(?i)cve[-_\s]?(\d{4})[-_\s]?(\d{4,7})", value)
+    return _normalize_cve_str(value)
+
+
+def normalize_cve_trusted(value: str | None) -> str | None:
+    """
+    normalize_cve() for fields that normally already hold canonical ids (NVD-derived upstreams).
+    - An exact uppercase "CVE-YYYY-NNNN[NNN]" is returned as is: no cache
+      lookup, no regex
+    - Anything else goes through normalize_cve()
+    """
+    if (
+        value.__class__ is str and 13 <= len(value) <= 16 and value.startswith("CVE-")
+        and value[8] == "-" and value[4:8].isdecimal() and value[9:].isdecimal()
+    ):
+        return value
+    return normalize_cve(value)
+
+
+@lru_cache(maxsize=CVE_CACHE_SIZE)
+def _normalize_cve_str(value: str) -> str | None:
+    # Fast path: a bare "CVE-YYYY-NNNN[NNN]" (by far the most common input) is
+    # checked with slices; only messy values fall through to the regex
+    if (
+        13 <= len(value) <= 16 and value[8] == "-" and value[:4].upper() == "CVE-"
+        and value[4:8].isdecimal() and value[9:].isdecimal()
+    ):
+        return "CVE-" + value[4:]
+    match = _CVE_PARTS_RE.search(value)
     if not match:
         return None
     return f"CVE-{match.group(1)}-{match.group(2).zfill(4)}"
 
 
+def normalize_cve_series(values):
+    """
+    Column-wise normalize_cve() for a pandas Series (call once per frame, not per row).
+    - The regex runs once per distinct value: a CVE repeated across rows is
+      extracted a single time, then broadcast back by position
+    - Non-matching and missing values come back as <NA>; the index is kept
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values.astype("string"))  # missing → code -1
+    parts = pd.Series(uniques, dtype="string").str.extract(_CVE_PARTS_RE)
+    normalized = pd.concat([
+        "CVE-" + parts[0] + "-" + parts[1].str.zfill(4),
+        pd.Series([pd.NA], dtype="string"),  # slot -1: what missing values map to
+    ], ignore_index=True)
+    return pd.Series(normalized.to_numpy()[codes], index=values.index, dtype="string")
+
+
 def extract_cves(value: str | None) -> list[str]:
     """
     Extract and normalize all CVEs from a mixed field.
@@ -22,10 +99,39 @@ def extract_cves(value: str | None) -> list[str]:
     """
     if not value or not isinstance(value, str):
         return []
-    matches = CVE_PATTERN.findall(value)
-    normalized = []
-    for m in matches:
-        n = normalize_cve(m)
-        if n and n not in normalized:
-            normalized.append(n)
-    return normalized
+    return list(_extract_cves_str(value))  # fresh list — callers may mutate it
+
+
+@lru_cache(maxsize=CVE_CACHE_SIZE)
+def _extract_cves_str(value: str) -> tuple[str, ...]:
+    if _HS_DB is not None and len(value) >= HS_MIN_LENGTH:
+        found = map(_normalize_cve_str, _hs_findall(value))
+    else:
+        # One pass of the precompiled parts regex yields (year, number) directly —
+        # no second normalize_cve() search per match
+        found = (f"CVE-{year}-{num.zfill(4)}" for year, num in _CVE_PARTS_RE.findall(value))
+    return tuple(dict.fromkeys(found))  # dedupes, keeps order of appearance
+
+
+def _hs_findall(value: str) -> list[str]:
+    """
+    CVE_PATTERN.findall() on Hyperscan (ASCII digits/whitespace only).
+    - Hyperscan reports every end offset of a match; the longest span per start,
+      taken left to right without overlaps, is what `re` would have returned
+    """
+    data = value.encode()
+    spans: dict[int, int] = {}
+
+    def on_match(_id, start, end, _flags, _context):
+        if end > spans.get(start, -1):
+            spans[start] = end
+
+    with _HS_LOCK:
+        _HS_DB.scan(data, match_event_handler=on_match)
+
+    matches, last_end = [], 0
+    for start in sorted(spans):
+        if start >= last_end:
+            last_end = spans[start]
+            matches.append(data[start:last_end].decode())
+    return matches
@@ -1,18 +1,73 @@
 # utils/dynamo_helpers.py
 import concurrent.futures
-from boto3.dynamodb.conditions import Attr
+from itertools import chain
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 import logging
 import boto3
+from decimal import Decimal
+from boto3.dynamodb.types import TypeSerializer
 from utils.time_utils import iso_now
 
+DEFAULT_REGION = "us-east-1"
 
-def parallel_scan(table, total_segments=8, filter_expr=None, log=None, max_retries=3, backoff=1.5):
+
+def get_ddb_resource(region=DEFAULT_REGION, max_pool_connections=50, max_attempts=10):
+    """
+    Shared DynamoDB resource for every writer in the pipeline.
+    - Adaptive retry mode paces retries (including batch_writer's unprocessed items)
+      with a client-side token bucket instead of hammering a throttled table.
+    - One pooled connection per worker thread up to max_pool_connections.
+    """
+    from botocore.config import Config
+
+    config = Config(
+        region_name=region,
+        max_pool_connections=max_pool_connections,
+        retries={"max_attempts": max_attempts, "mode": "adaptive"},
+    )
+    return boto3.resource("dynamodb", config=config)
+
+
+def get_raw_client(table):
+    """
+    Low-level DynamoDB client for the same region, endpoint and config (retries,
+    pool size) as `table`.
+    - table.meta.client is NOT raw: the resource registers a transformation that
+      serializes every request again, so pre-built AttributeValues ({"S": ...})
+      sent through it arrive double-wrapped and are rejected
+    - Use this for anything fed by compile_update_builder(serialize=...)
+    """
+    resource_client = table.meta.client
+    return boto3.client(
+        "dynamodb",
+        region_name=resource_client.meta.region_name,
+        endpoint_url=resource_client.meta.endpoint_url,
+        config=resource_client.meta.config,
+    )
+
+
+def _projection_params(projection):
+    """
+    Scan params fetching only the given attribute names.
+    - Every name goes through a #p placeholder, so reserved words and names
+      with spaces ("CVE ID", "Name") are safe.
+    """
+    if not projection:
+        return {}
+    names = {f"#p{i}": name for i, name in enumerate(projection)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def parallel_scan(table, total_segments=8, filter_expr=None, log=None, projection=None):
     """
     High-performance parallel scan for DynamoDB.
     - Uses multiple threads for scanning partitions concurrently.
-    - Handles pagination, throttling, and transient network errors.
+    - Handles pagination; throttling and transient errors are retried by the
+      client's botocore retry mode (adaptive for get_ddb_resource() tables).
     - Returns all items from the table (or filtered subset if filter_expr provided).
+    - projection: optional attribute names to fetch (e.g. ["cve_id"]); RCU is
+      unchanged but response size and decode time shrink with the item.
     """
 
     import time
@@ -21,11 +76,8 @@ def parallel_scan(table, total_segments=8, filter_expr=None, log=None, max_retri
 
     log = log or logging.getLogger("vuln-scan")
 
-    # Use a low-level client for thread-safe parallelism
-    dynamodb_resource = boto3.resource("dynamodb", region_name=table.meta.client.meta.region_name)
-    table = dynamodb_resource.Table(table.name)
-
-    # Create paginator once (thread-safe)
+    # Paginate on the caller's low-level client (clients are thread-safe), so the
+    # table's retry config — or a DAX client — is honoured by every segment.
     paginator = table.meta.client.get_paginator("scan")
     def scan_segment(seg):
         """Scan a single DynamoDB partition segment."""
@@ -36,47 +88,33 @@ def parallel_scan(table, total_segments=8, filter_expr=None, log=None, max_retri
         }
         if filter_expr is not None:
             params["FilterExpression"] = filter_expr
+        params.update(_projection_params(projection))
 
         items = []
-        retries = 0
-
-        while True:
-            try:
-                for page in paginator.paginate(**params):
-                    items.extend(page.get("Items", []))
-                break  # exit retry loop if successful
-
-            except botocore.exceptions.ClientError as e:
-                error_code = e.response["Error"]["Code"]
-                if error_code in ("ProvisionedThroughputExceededException", "ThrottlingException"):
-                    retries += 1
-                    if retries > max_retries:
-                        log.error(f"❌ Segment {seg}: exceeded max retries ({max_retries}).")
-                        break
-                    sleep_time = backoff ** retries
-                    log.warning(f"⚠️ Segment {seg}: throttled, retry {retries}/{max_retries}, sleeping {sleep_time:.2f}s")
-                    time.sleep(sleep_time)
-                else:
-                    log.error(f"❌ Segment {seg}: {e}")
-                    break
-            except Exception as e:
-                log.error(f"⚠️ Unexpected error in segment {seg}: {e}")
-                break
-
-        log.debug(f"Segment {seg} done: {len(items)} items")
+        # Throttling is retried inside botocore (adaptive mode, see get_ddb_resource);
+        # anything that still surfaces here is terminal for this segment
+        try:
+            for page in paginator.paginate(**params):
+                items.extend(page.get("Items", []))
+        except botocore.exceptions.ClientError as e:
+            log.error(f"❌ Segment {seg}: {e}")
+        except Exception as e:
+            log.error(f"⚠️ Unexpected error in segment {seg}: {e}")
+
+        log.debug("Segment %d done: %d items", seg, len(items))
         return items
 
     start = time.time()
-    all_items = []
 
     log.info(f"⚙️ Starting parallel scan with {total_segments} segments on table '{table.name}'")
 
     # Run all segments in parallel
     with ThreadPoolExecutor(max_workers=total_segments) as executor:
         futures = [executor.submit(scan_segment, seg) for seg in range(total_segments)]
-        for future in as_completed(futures):
-            segment_items = future.result()
-            all_items.extend(segment_items)
+        segments = [future.result() for future in as_completed(futures)]
+
+    # One C-level concatenation of the per-segment lists
+    all_items = list(chain.from_iterable(segments))
 
     duration = time.time() - start
     log.info(f"✅ Scan complete for {table.name}: {len(all_items)} items in {duration:.2f}s")
@@ -84,10 +122,147 @@ def parallel_scan(table, total_segments=8, filter_expr=None, log=None, max_retri
     return all_items
 
 
-def get_max_uploaded_date(dynamodb, table_name: str, log) -> str:
+def parallel_scan_iter(table, total_segments=8, filter_expr=None, log=None, max_pending_pages=64,
+                       projection=None):
+    """
+    Streaming variant of parallel_scan().
+    - Segment workers push each page onto a queue as soon as it arrives.
+    - Yields items while other segments are still scanning, so the caller can
+      write/transform in a pipelined fashion without holding the whole table in RAM.
+    - The queue holds at most max_pending_pages pages (high-water mark): when the
+      consumer is slower than the scan, segment workers pause instead of buffering.
+    - projection: optional attribute names to fetch (e.g. ["cve_id"]); trims each
+      page to just those fields.
+    - Stops the workers early if the caller abandons the generator.
+    """
+
+    import time
+    import queue
+    import threading
+    import botocore
+
+    log = log or logging.getLogger("vuln-scan")
+
+    paginator = table.meta.client.get_paginator("scan")
+    pages = queue.Queue(maxsize=max_pending_pages)
+    stop = threading.Event()
+    segment_done = object()
+
+    def put(page):
+        """Blocking put that gives up once the consumer has gone away."""
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def scan_segment(seg):
+        """Scan one segment, pushing each page onto the queue."""
+        params = {
+            "TableName": table.name,
+            "Segment": seg,
+            "TotalSegments": total_segments,
+        }
+        if filter_expr is not None:
+            params["FilterExpression"] = filter_expr
+        params.update(_projection_params(projection))
+
+        count = 0
+
+        # Throttling is retried inside botocore (adaptive mode, see get_ddb_resource)
+        try:
+            for page in paginator.paginate(**params):
+                if stop.is_set():
+                    break
+                items = page.get("Items", [])
+                count += len(items)
+                put(items)
+        except botocore.exceptions.ClientError as e:
+            log.error(f"❌ Segment {seg}: {e}")
+        except Exception as e:
+            log.error(f"⚠️ Unexpected error in segment {seg}: {e}")
+        finally:
+            log.debug("Segment %d done: %d items", seg, count)
+            put(segment_done)
+
+    start = time.time()
+    total = 0
+
+    log.info(f"⚙️ Starting streaming parallel scan with {total_segments} segments on table '{table.name}'")
+
+    workers = [threading.Thread(target=scan_segment, args=(seg,), daemon=True) for seg in range(total_segments)]
+    for w in workers:
+        w.start()
+
+    try:
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is segment_done:
+                remaining -= 1
+                continue
+            total += len(page)
+            yield from page
+    finally:
+        stop.set()
+
+    duration = time.time() - start
+    log.info(f"✅ Streaming scan complete for {table.name}: {total} items in {duration:.2f}s")
+
+
+def iter_table_export(table, s3_bucket, s3_prefix=None, log=None, poll_seconds=30):
+    """
+    Snapshot a table via Export-to-S3 and stream its items back.
+    - Uses ExportTableToPointInTime (DYNAMODB_JSON): billed per GB exported and
+      consumes no table read capacity, unlike a full Scan.
+    - Requires point-in-time recovery on the table and write access to the bucket.
+    - Yields items in DynamoDB JSON form, e.g. {"cve_id": {"S": "CVE-..."}}.
+    """
+    import gzip
+    import json
+    import time
+
+    log = log or logging.getLogger("vuln-scan")
+    client = table.meta.client
+    s3 = boto3.client("s3", region_name=client.meta.region_name)
+
+    params = {"TableArn": table.table_arn, "S3Bucket": s3_bucket, "ExportFormat": "DYNAMODB_JSON"}
+    if s3_prefix:
+        params["S3Prefix"] = s3_prefix
+
+    start = time.time()
+    export = client.export_table_to_point_in_time(**params)["ExportDescription"]
+    log.info(f"📤 Export of {table.name} started → s3://{s3_bucket}/{s3_prefix or ''} ({export['ExportArn']})")
+    while export["ExportStatus"] == "IN_PROGRESS":
+        time.sleep(poll_seconds)
+        export = client.describe_export(ExportArn=export["ExportArn"])["ExportDescription"]
+    if export["ExportStatus"] != "COMPLETED":
+        raise RuntimeError(f"Export of {table.name} {export['ExportStatus']}: {export.get('FailureMessage')}")
+    log.info(f"✅ Export of {table.name} completed in {time.time() - start:.0f}s")
+
+    # manifest-summary.json → manifest-files.json (one JSON line per gzip data file)
+    summary = json.loads(s3.get_object(Bucket=s3_bucket, Key=export["ExportManifest"])["Body"].read())
+    manifest = s3.get_object(Bucket=s3_bucket, Key=summary["manifestFilesS3Key"])["Body"].read().decode()
+
+    for line in manifest.splitlines():
+        if not line.strip():
+            continue
+        data_key = json.loads(line)["dataFileS3Key"]
+        body = s3.get_object(Bucket=s3_bucket, Key=data_key)["Body"]
+        with gzip.GzipFile(fileobj=body) as fh:
+            for raw in fh:
+                yield json.loads(raw)["Item"]
+
+
+def get_max_uploaded_date(dynamodb, table_name: str, log, total_segments=8) -> str:
     """
     Fetch max(uploaded_date) or max(date_updated) efficiently.
-    Falls back to table scan if no sort key-based index exists.
+    Queries the reverse-sorted '<column>-index' GSI (PK '_all' = "_all") when
+    the table has one; falls back to a segmented parallel scan otherwise
+    (total_segments threads, each reducing its segment to a single max).
+    (Writers that create the index, e.g. metasploit_db/load.py, stamp
+    _all = "_all" on every item.)
 
     Automatically detects column:
     - For NVD → uses 'date_updated'
@@ -96,40 +271,68 @@ def get_max_uploaded_date(dynamodb, table_name: str, log) -> str:
     table = dynamodb.Table(table_name)
     column = "date_updated" if "nvd" in table_name else "uploaded_date"
 
-    log.info(f"📊 Fetching max({column}) from {table_name} using scan()")
-
+    # Fast path: newest entry from the sort-key GSI, O(1) regardless of table size
     try:
-        # Use a lightweight projection to fetch only date fields
-        resp = table.scan(
-            FilterExpression=Attr(column).gt("1970-01-01T00:00:00Z"),
-            ProjectionExpression=column
+        resp = table.query(
+            IndexName=f"{column}-index",
+            KeyConditionExpression=Key("_all").eq("_all"),
+            ScanIndexForward=False,
+            Limit=1,
+            ProjectionExpression=column,
         )
-
         items = resp.get("Items", [])
-        while "LastEvaluatedKey" in resp:
-            resp = table.scan(
-                FilterExpression=Attr(column).gt("1970-01-01T00:00:00Z"),
-                ProjectionExpression=column,
-                ExclusiveStartKey=resp["LastEvaluatedKey"]
-            )
-            items.extend(resp.get("Items", []))
-
-        if not items:
+        if items and column in items[0]:
+            max_date = items[0][column]
+            log.info(f"✅ Max {column} for {table_name} (via {column}-index): {max_date}")
+            return max_date
+    except ClientError as e:
+        log.debug("%s-index not usable on %s: %s", column, table_name, e)
+
+    log.info(f"📊 Fetching max({column}) from {table_name} using scan() ({total_segments} segments)")
+
+    client = table.meta.client
+
+    def segment_max(seg):
+        """
+        Max of one scan segment, folded page by page (only the running max is kept).
+        Each request resumes after the last page with the filter raised to the
+        max seen so far, so later pages only return items that beat it.
+        """
+        params = {
+            "TableName": table_name,
+            "ProjectionExpression": column,
+            "Segment": seg,
+            "TotalSegments": total_segments,
+        }
+        threshold = "1970-01-01T00:00:00Z"
+        seg_max = ""
+        while True:
+            resp = client.scan(FilterExpression=Attr(column).gt(threshold), **params)
+            for item in resp.get("Items", []):
+                value = item.get(column)
+                if value and value > seg_max:
+                    seg_max = value
+            threshold = seg_max or threshold
+            if "LastEvaluatedKey" not in resp:
+                return seg_max
+            params["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=total_segments) as ex:
+            max_date = max(ex.map(segment_max, range(total_segments)))
+
+        if not max_date:
             log.warning(f"⚠️ No {column} values found in {table_name}. Using current time.")
-            from utils.time_utils import iso_now
             return iso_now()
 
-        max_date = max(i[column] for i in items if column in i)
         log.info(f"✅ Max {column} for {table_name}: {max_date}")
         return max_date
 
     except Exception as e:
         log.error(f"❌ Failed to get max({column}) for {table_name}: {e}")
-        from utils.time_utils import iso_now
         return iso_now()
 
 
-
 def build_update_expression_and_values(attr_map: dict, timestamp: str):
     """Build a DynamoDB UpdateExpression dynamically for given attributes."""
     parts, eav, ean = [], {}, {}
@@ -150,6 +353,52 @@ def build_update_expression_and_values(attr_map: dict, timestamp: str):
     return update_expr, eav, ean
 
 
+class FastTypeSerializer(TypeSerializer):
+    """
+    TypeSerializer with a fast path for the scalar types that make up almost
+    every CVE payload (strings first). Anything else — maps, lists, sets,
+    binary, and the float/NaN errors — goes through boto3's reflective path,
+    which recurses back into this serialize() for nested values.
+    Its output is wire format: hand it to a raw client (get_raw_client()) only.
+    """
+
+    def serialize(self, value):
+        if isinstance(value, str):
+            return {"S": value}
+        if value is None:
+            return {"NULL": True}
+        if isinstance(value, bool):  # before int: bool is an int subclass
+            return {"BOOL": value}
+        if isinstance(value, (int, Decimal)):
+            return {"N": self._serialize_n(value)}
+        return super().serialize(value)
+
+
+def compile_update_builder(columns, serialize=None):
+    """
+    Specialize an UpdateExpression for a fixed attribute schema.
+    Returns (update_expression, expr_attr_names, build_values), where
+    build_values(values) is generated once via exec and maps every placeholder
+    straight to values[i] — `values` is a plain tuple aligned with `columns`,
+    so rows held for writing cost a few pointers each instead of a dict.
+    Placeholders are indexed (#a0/:v0) so reserved words and column names with
+    '-' or spaces are always escaped. Pass serialize (e.g. TypeSerializer().serialize)
+    to get low-level client AttributeValues instead of plain Python values.
+    Serialized output must only go to a raw client (get_raw_client()), never to
+    a resource or table.meta.client, which would serialize it a second time.
+    """
+    columns = tuple(columns)
+    update_expression = "SET " + ", ".join(f"#a{i} = :v{i}" for i in range(len(columns)))
+    expr_attr_names = {f"#a{i}": col for i, col in enumerate(columns)}
+
+    wrap = "_s(t[{}])" if serialize is not None else "t[{}]"
+    entries = ", ".join(f"':v{i}': " + wrap.format(i) for i in range(len(columns)))
+    src = f"def build_values(t):\n    return {{{entries}}}\n"
+    namespace = {"_s": serialize}
+    exec(src, namespace)
+    return update_expression, expr_attr_names, namespace["build_values"]
+
+
 def get_last_sync(metadata_table, source_name):
     try:
         r = metadata_table.get_item(Key={"source_table": source_name})
@@ -175,27 +424,24 @@ def get_all_cve_ids(dynamodb, table_name, log=None, total_segments=8):
     table = dynamodb.Table(table_name)
     log.info(f"🧩 Scanning {table_name} to collect all CVE IDs...")
 
-    items = []
+    unique_cves = set()
     deserializer = TypeDeserializer()
 
     try:
-        from utils.dynamo_helpers import parallel_scan
-        all_records = parallel_scan(table, log=log, total_segments=total_segments)
-
-        for r in all_records:
-            if "cve_id" in r:
-                val = r["cve_id"]
+        # Streamed: pages are folded into the set as they arrive, never held as a list
+        for r in parallel_scan_iter(table, log=log, total_segments=total_segments, projection=["cve_id"]):
+            val = r.get("cve_id")
+            if val:
                 # Handle both {"S": "CVE-..."} and plain strings
                 if isinstance(val, dict):
                     val = deserializer.deserialize(val)
                 if isinstance(val, str):
-                    items.append(val.strip())
+                    unique_cves.add(val.strip())  # dedup as we go, no intermediate list
 
     except botocore.exceptions.ClientError as e:
         log.error(f"❌ Error collecting CVE IDs from {table_name}: {e}")
     except Exception as e:
         log.error(f"⚠️ Unexpected error scanning {table_name}: {e}")
 
-    unique_cves = set(items)
     log.info(f"📦 Found {len(unique_cves)} unique CVE IDs in {table_name}.")
     return unique_cves
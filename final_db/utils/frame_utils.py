@@ -0,0 +1,98 @@
+# utils/frame_utils.py
+"""
+Column-wise building blocks for the clean_and_rename_frame() variants of the
+static transforms. pandas is imported lazily so the row-wise pipeline never
+needs it installed.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)  # one entry per transform's null tuple
+def _mask_values(nulls):
+    """Placeholder values to mask with isin(); None is already missing to pandas."""
+    return [n for n in nulls if n is not None]
+
+
+def normalize_headers(df, normalize, nulls=()):
+    """
+    Rename every header through `normalize` (e.g. lowercase, no underscores).
+    - Headers that collapse onto the same key are coalesced left to right
+    - Values listed in `nulls` are masked first, so a placeholder in one
+      variant never hides a real value in another
+    """
+    import pandas as pd
+
+    if nulls:
+        df = df.mask(df.isin(_mask_values(tuple(nulls))))
+    df = df.rename(columns=normalize)
+    if not df.columns.duplicated().any():
+        return df
+    return pd.DataFrame(
+        {name: df.loc[:, df.columns == name].bfill(axis=1).iloc[:, 0] for name in dict.fromkeys(df.columns)},
+        index=df.index,
+    )
+
+
+def rename_frame(df, rename_pairs, nulls=()):
+    """
+    Apply a (source, column) rename table to a whole DataFrame.
+    - Aliases that map to the same column are coalesced left to right
+      (the first non-null value per row wins)
+    - Source columns absent from the frame are skipped
+    - Values listed in `nulls` (e.g. "null", "") are treated as missing
+    """
+    import pandas as pd
+
+    if nulls:
+        df = df.mask(df.isin(_mask_values(tuple(nulls))))
+
+    out = pd.DataFrame(index=df.index)
+    for src, dst in rename_pairs:
+        if src not in df:
+            continue
+        out[dst] = df[src] if dst not in out else out[dst].combine_first(df[src])
+    return out
+
+
+def rows_with_cve(df, cve_aliases):
+    """
+    Keep only rows where at least one CVE alias column holds a value.
+    - cve_aliases is the transform's (source, column) alias table
+    - Run before rename_frame so CVE-less rows (dropped by the join anyway)
+      never go through the rename and normalize passes
+    """
+    present = [src for src, _ in cve_aliases if src in df]
+    return df.dropna(subset=present, how="all") if present else df.iloc[:0]
+
+
+def finalize_frame(df, columns):
+    """
+    Reindex to the final schema and turn NaN / pd.NA into None (→ DynamoDB NULL).
+    Columns the frame never produced come back as all-None.
+    """
+    df = df.reindex(columns=list(columns)).astype(object)
+    return df.where(df.notna(), None)
+
+
+def map_frame_chunks(df, frame_fn, max_workers=None, chunk_rows=50_000):
+    """
+    Run a clean_and_rename_frame-style function over a large DataFrame on a process pool.
+    - The frame is cut into row slices of at most chunk_rows; each worker
+      transforms whole slices, so IPC is paid per chunk, not per row
+    - frame_fn must be a module-level function (picklable); the rename tables
+      it reads are module constants, shared copy-on-write by forked workers
+    - Small frames (a single chunk) are transformed in-process
+    - The result carries a fresh RangeIndex either way
+    """
+    import os
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows)]
+    if len(chunks) <= 1:
+        return frame_fn(df).reset_index(drop=True)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return pd.concat(pool.map(frame_fn, chunks), ignore_index=True)
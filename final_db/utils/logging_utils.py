@@ -1,17 +1,31 @@
 # utils/logging_utils.py
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 def setup_logging():
     log_filename = f"sync_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler(),
-        ],
-    )
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    handlers = [
+        logging.FileHandler(log_filename),
+        logging.StreamHandler(),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Worker threads only enqueue records; a single listener thread formats
+    # and writes them, so file/console I/O never blocks the update pools.
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # flush remaining records on exit
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
     log = logging.getLogger("vuln-sync")
     log.info(f" Logs will be saved to {log_filename}")
     return log
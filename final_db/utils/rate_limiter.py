@@ -0,0 +1,53 @@
+# utils/rate_limiter.py
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    - Refills at `rate` tokens/sec up to `capacity` (defaults to one second of rate).
+    - acquire(n) blocks until n tokens are available, so writers sharing one
+      bucket never exceed the configured throughput between them.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1):
+        n = min(n, self.capacity)  # a request larger than the bucket would wait forever
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_write_limiter = None
+_write_limiter_lock = threading.Lock()
+
+
+def get_write_limiter():
+    """
+    Process-wide write limiter sized from the WCU_LIMIT env var (write units/sec).
+    Returns None when unset — on-demand tables need no client-side throttling.
+    Every writer thread gets the same bucket, so the limit is global.
+    """
+    global _write_limiter
+    limit = os.environ.get("WCU_LIMIT")
+    if not limit:
+        return None
+    with _write_limiter_lock:
+        if _write_limiter is None:
+            _write_limiter = TokenBucket(float(limit))
+        return _write_limiter
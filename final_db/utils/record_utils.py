@@ -0,0 +1,11 @@
+# utils/record_utils.py
+from typing import Any, Dict, Iterable, Optional
+
+
+def first_present(record: Dict[str, Any], names: Iterable[str]) -> Optional[Any]:
+    """Return the value of the first of `names` set on `record` (absent and None both skip)."""
+    for n in names:
+        v = record.get(n)
+        if v is not None:
+            return v
+    return None
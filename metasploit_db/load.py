@@ -4,11 +4,22 @@ import time
 import json
 import hashlib
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
+from collections import defaultdict
+from functools import lru_cache, partial
+from itertools import chain
 from typing import List, Dict, Optional
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:  # optional: ~5-10x faster baseline serialization, straight to bytes
+    import orjson
+except ImportError:
+    orjson = None
+
 # Config defaults (override via user_cfg)
 DEFAULT_CONFIG = {
     "TABLE_NAME": "infoservices-cybersecurity-vuln-metasploit-data",
@@ -16,11 +27,19 @@ DEFAULT_CONFIG = {
     "BASELINE_FILENAME": "metasploit_baseline.json",
     "BATCH_PROGRESS_INTERVAL": 500,
     "BATCH_WRITE_CHUNK_SIZE": 500,
+    "BATCH_WRITE_CONCURRENCY": 8,   # chunks written in parallel, each through its own batch_writer
     "AWS_REGION": "us-east-1",
     "SKIP_S3_UPLOAD": False,   # set True to avoid uploading merged baseline to S3
 }
 
 META_ID_PREFIX = "META"
+
+# Constant-partition GSI read by final_db get_max_uploaded_date(): every item
+# carries _all = "_all", so a reverse Query with Limit=1 returns the newest
+# uploaded_date without scanning the table
+MAX_DATE_INDEX = "uploaded_date-index"
+MAX_DATE_PARTITION = "_all"
+
 CVE_RE = re.compile(r"(CVE-\d{4}-\d{4,7})", re.IGNORECASE)
 
 
@@ -33,23 +52,105 @@ def _resolve_config(user_cfg: Dict) -> Dict:
     return cfg
 
 
+# Runs of whitespace (\r and \n included) collapse to one space
+_WS_RE = re.compile(r"\s+")
+
+
 def _clean_for_hash(v) -> str:
     if v is None:
         return ""
-    s = str(v)
-    # normalize whitespace and remove newlines
-    s = s.replace("\r", " ").replace("\n", " ")
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = v if isinstance(v, str) else str(v)
+    # normalize whitespace and remove newlines (one regex pass; \s already covers \r/\n)
+    return _WS_RE.sub(" ", s).strip()
+
+
+def _content_hash_of_values(values) -> str:
+    # hash of the cleaned values joined by '|', fed value by value (no joined copy)
+    h = hashlib.sha256()
+    sep = b""
+    for v in values:
+        h.update(sep)
+        h.update(_clean_for_hash(v).encode("utf-8"))
+        sep = b"|"
+    return h.hexdigest()
 
 
 def _compute_content_hash_for_record(rec: Dict, canonical_fields: List[str]) -> str:
-    # create stable string of canonical fields joined by '|'
-    parts = []
-    for f in canonical_fields:
-        parts.append(_clean_for_hash(rec.get(f, "")))
-    joined = "|".join(parts).encode("utf-8")
-    return hashlib.sha256(joined).hexdigest()
+    # map(rec.get, ...) pulls the fields in C; a missing field is None, which hashes as ""
+    return _content_hash_of_values(map(rec.get, canonical_fields))
+
+
+def _sha256_backend() -> str:
+    """
+    Describe the SHA-256 implementation content hashes run on.
+    - hashlib.sha256 is OpenSSL's when CPython was built against it; OpenSSL
+      picks the SHA-NI code path itself when the CPU advertises sha_ni
+    - CPU flags are read from /proc/cpuinfo (Linux); elsewhere they're "unknown"
+    """
+    import ssl
+
+    if hashlib.sha256.__name__ != "openssl_sha256":
+        return "builtin (no OpenSSL) — expect the slow scalar path"
+    try:
+        with open("/proc/cpuinfo") as fh:
+            sha_ni = "yes" if " sha_ni" in fh.read() else "no"
+    except OSError:
+        sha_ni = "unknown"
+    return f"{ssl.OPENSSL_VERSION}, CPU SHA extensions: {sha_ni}"
+
+
+# Attributes the DynamoDB diff reads when the full baseline isn't needed (module key variants,
+# id for id preservation/generation, stored content_hash)
+BASELINE_KEY_ATTRS = ("id", "module_key", "module_id", "moduleKey", "module", "content_hash")
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+
+# Below this many records, process start-up and pickling cost more than hashing saves
+HASH_PARALLEL_MIN_RECORDS = 20_000
+HASH_CHUNK_SIZE = 2_000
+
+
+def _hash_chunk(canonical_fields: List[str], recs: List[Dict]) -> List[str]:
+    return [_compute_content_hash_for_record(rec, canonical_fields) for rec in recs]
+
+
+def _compute_content_hashes(records_by_key: Dict[str, Dict], canonical_fields: List[str]) -> Dict[str, str]:
+    """
+    content_hash for every record, keyed like the input.
+    - Large inputs are hashed in chunks on a process pool (SHA-256 + whitespace
+      cleanup is CPU-bound and independent per record); small ones in-process
+    """
+    recs = list(records_by_key.values())
+    if len(recs) < HASH_PARALLEL_MIN_RECORDS:
+        hashes = _hash_chunk(canonical_fields, recs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [recs[i:i + HASH_CHUNK_SIZE] for i in range(0, len(recs), HASH_CHUNK_SIZE)]
+        with ProcessPoolExecutor() as pool:
+            hashes = list(chain.from_iterable(pool.map(partial(_hash_chunk, canonical_fields), chunks)))
+    return dict(zip(records_by_key, hashes))
+
+
+def _batch_get_by_id(ddb, table_name: str, ids) -> List[Dict]:
+    """
+    Full items for the given ids (the table's hash key) via BatchGetItem.
+    - 100 keys per request; UnprocessedKeys are resent with a short backoff
+    """
+    ids = list(ids)
+    items = []
+    for i in range(0, len(ids), BATCH_GET_MAX_KEYS):
+        request = {table_name: {"Keys": [{"id": v} for v in ids[i:i + BATCH_GET_MAX_KEYS]]}}
+        attempt = 0
+        while request:
+            if attempt:
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))
+            resp = ddb.batch_get_item(RequestItems=request)
+            items.extend(resp.get("Responses", {}).get(table_name, []))
+            request = resp.get("UnprocessedKeys") or None
+            attempt += 1
+    return items
 
 
 def _extract_cve(refs):
@@ -59,6 +160,15 @@ def _extract_cve(refs):
     return m.group(1).upper() if m else None
 
 
+_NULL_STRINGS = frozenset(("none", "nan", ""))
+
+
+def _is_plain_number(s: str) -> bool:
+    """Same strings as re.fullmatch(r"-?\d+(\.\d+)?", s); isdecimal() is exactly \d."""
+    head, dot, tail = (s[1:] if s[:1] == "-" else s).partition(".")
+    return head.isdecimal() and (not dot or tail.isdecimal())
+
+
 def _normalize_for_ddb(v):
     if v is None:
         return None
@@ -70,21 +180,110 @@ def _normalize_for_ddb(v):
         return v
     if isinstance(v, str):
         s = v.strip()
-        if s.lower() in {"none", "nan", ""}:
+        if s.lower() in _NULL_STRINGS:
             return None
-        # try numeric conversion if numeric string
-        try:
-            if re.fullmatch(r"-?\d+(\.\d+)?", s):
-                return Decimal(s)
-        except Exception:
-            pass
+        # numeric strings (-?\d+(\.\d+)?) become Decimal; checked with str methods, no regex
+        if _is_plain_number(s):
+            return Decimal(s)
         return s
     # fallback to string representation
     return str(v)
 
 
-def _s3_put_bytes(s3_client, bucket: str, key: str, data: bytes):
-    s3_client.put_object(Bucket=bucket, Key=key, Body=data)
+# Short strings repeat across modules and syncs (types, ranks, platforms, dates);
+# long free text (descriptions) would only fill the cache
+_CACHED_STR_MAX_LEN = 64
+
+
+@lru_cache(maxsize=100_000)
+def _normalize_str_cached(v: str):
+    return _normalize_for_ddb(v)
+
+
+def _normalize_item_value(v):
+    """_normalize_for_ddb(), memoized for short exact-str values (the result is immutable)."""
+    if type(v) is str and len(v) <= _CACHED_STR_MAX_LEN:
+        return _normalize_str_cached(v)
+    return _normalize_for_ddb(v)
+
+
+def _json_default(obj):
+    # DynamoDB scans hand back Decimal numbers and sets
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_entry_bytes(entry: Dict) -> bytes:
+    """One indented baseline entry as UTF-8 JSON; orjson when installed, json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(entry, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(entry, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8")
+
+
+# Baseline upload: parts flushed as they fill (S3's minimum part size is 5 MB)
+BASELINE_PART_SIZE = 8 * 1024 * 1024
+BASELINE_UPLOAD_CONCURRENCY = 10
+
+
+def _upload_json_array(s3_client, bucket: str, key: str, entries) -> None:
+    """
+    Stream `entries` to s3://bucket/key as one JSON array, in bounded memory.
+    - Entries are encoded one at a time; every BASELINE_PART_SIZE bytes become a
+      multipart part, with up to BASELINE_UPLOAD_CONCURRENCY parts in flight
+    - A payload smaller than one part goes up as a single put_object
+    - The multipart upload is aborted if anything fails
+    """
+    from collections import deque
+
+    upload_id = None
+    pool = None
+    futures, inflight = [], deque()
+
+    def upload_part(number, body):
+        resp = s3_client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+        return {"PartNumber": number, "ETag": resp["ETag"]}
+
+    def submit(body):
+        nonlocal upload_id, pool
+        if upload_id is None:
+            upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+            pool = ThreadPoolExecutor(max_workers=BASELINE_UPLOAD_CONCURRENCY)
+        if len(inflight) >= BASELINE_UPLOAD_CONCURRENCY:
+            inflight.popleft().result()  # hold at most N unsent parts in memory
+        fut = pool.submit(upload_part, len(futures) + 1, body)
+        futures.append(fut)
+        inflight.append(fut)
+
+    try:
+        buf = bytearray(b"[")
+        sep = b"\n"
+        for entry in entries:
+            buf += sep
+            buf += _json_entry_bytes(entry)
+            sep = b",\n"
+            if len(buf) >= BASELINE_PART_SIZE:
+                submit(bytes(buf))
+                buf = bytearray()
+        buf += b"\n]" if sep == b",\n" else b"]"
+
+        if upload_id is None:
+            s3_client.put_object(Bucket=bucket, Key=key, Body=bytes(buf))
+            return
+        submit(bytes(buf))
+        parts = [f.result() for f in futures]
+        s3_client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+    except BaseException:
+        if upload_id is not None:
+            s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
 
 
 def _s3_get_text_if_exists(s3_client, bucket: str, key: str) -> Optional[str]:
@@ -98,31 +297,40 @@ def _s3_get_text_if_exists(s3_client, bucket: str, key: str) -> Optional[str]:
         raise
 
 
-def _next_meta_id_for_year(existing_ids_set, year: int) -> str:
-    max_seq = 0
-    pattern = re.compile(rf"^{META_ID_PREFIX}-(\d{{4}})-0*(\d+)$")
-    for mid in existing_ids_set:
-        m = pattern.match(str(mid))
+_META_ID_RE = re.compile(rf"^{META_ID_PREFIX}-(\d{{4}})-0*(\d+)$")
+
+
+def _max_meta_seq_by_year(existing_ids) -> Dict[int, int]:
+    """Highest META-<year>-<seq> sequence per year, from one pass over the existing ids."""
+    year_max: Dict[int, int] = defaultdict(int)
+    for mid in existing_ids:
+        m = _META_ID_RE.match(str(mid))
         if not m:
             continue
-        try:
-            y, seq = int(m.group(1)), int(m.group(2))
-            if y == year and seq > max_seq:
-                max_seq = seq
-        except Exception:
-            continue
-    return f"{META_ID_PREFIX}-{year}-{str(max_seq + 1).zfill(6)}"
+        y, seq = int(m.group(1)), int(m.group(2))
+        if seq > year_max[y]:
+            year_max[y] = seq
+    return year_max
+
+
+def _next_meta_id_for_year(year_max: Dict[int, int], year: int) -> str:
+    # claims the next sequence number, so consecutive calls never collide
+    year_max[year] += 1
+    return f"{META_ID_PREFIX}-{year}-{str(year_max[year]).zfill(6)}"
 
 
 def _write_chunk(table, chunk: List[Dict], progress_fn=None):
-    # uses batch_writer - let boto3 handle retries
+    # uses batch_writer - let boto3 handle retries; one writer per call, so
+    # chunks can be written from several threads at once
     written = 0
-    with table.batch_writer() as batch:
+    with table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
         for rec in chunk:
-            safe_item = {k: _normalize_for_ddb(v) for k, v in rec.items()}
+            safe_item = {k: _normalize_item_value(v) for k, v in rec.items()}
             # ensure id exists as string (DDB hash key)
             if safe_item.get("id") is None:
                 safe_item["id"] = str(rec.get("id") or "")
+            # partition key of the max-date GSI (see MAX_DATE_INDEX)
+            safe_item[MAX_DATE_PARTITION] = MAX_DATE_PARTITION
             try:
                 batch.put_item(Item=safe_item)
                 written += 1
@@ -155,11 +363,16 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
         aws_secret_access_key=cfg.get("AWS_SECRET_ACCESS_KEY"),
         region_name=cfg.get("AWS_REGION")
     )
+    concurrency = max(1, int(cfg.get("BATCH_WRITE_CONCURRENCY", 8)))
     ddb = boto3.resource(
         "dynamodb",
         aws_access_key_id=cfg.get("AWS_ACCESS_KEY_ID"),
         aws_secret_access_key=cfg.get("AWS_SECRET_ACCESS_KEY"),
-        region_name=cfg.get("AWS_REGION")
+        region_name=cfg.get("AWS_REGION"),
+        # one pooled connection per writer thread; adaptive retries pace
+        # batch_writer's resends when parallel chunks hit the WCU ceiling
+        config=Config(max_pool_connections=max(10, concurrency),
+                      retries={"max_attempts": 10, "mode": "adaptive"}),
     )
 
     # Ensure DDB table exists (create if missing)
@@ -170,7 +383,20 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
         t = ddb.create_table(
             TableName=table_name,
             KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
-            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"},
+                {"AttributeName": MAX_DATE_PARTITION, "AttributeType": "S"},
+                {"AttributeName": "uploaded_date", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[{
+                "IndexName": MAX_DATE_INDEX,
+                "KeySchema": [
+                    {"AttributeName": MAX_DATE_PARTITION, "KeyType": "HASH"},
+                    {"AttributeName": "uploaded_date", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+                "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+            }],
             ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
         )
         t.meta.client.get_waiter("table_exists").wait(TableName=table_name)
@@ -190,10 +416,15 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
     print(f"🔁 Scanning existing records from DynamoDB table '{table_name}' ...")
     baseline_map: Dict[str, Dict] = {}           # keyed by module_key
     existing_generated_ids = set()
+    projected = bool(cfg.get("SKIP_S3_UPLOAD", False))
     try:
         paginator = table.meta.client.get_paginator("scan")
         scan_kwargs = {"TableName": table_name}
-        # We'll request all attributes; if table large consider limiting ProjectionExpression
+        if projected:
+            # No merged baseline to upload: the diff only needs keys and stored hashes
+            names = {f"#b{i}": attr for i, attr in enumerate(BASELINE_KEY_ATTRS)}
+            scan_kwargs["ProjectionExpression"] = ", ".join(names)
+            scan_kwargs["ExpressionAttributeNames"] = names
         for page in paginator.paginate(**scan_kwargs):
             for item in page.get("Items", []):
                 # item may be missing module_key (older rows) - try common keys
@@ -203,7 +434,9 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
                     mk = f"_id_{item.get('id')}"
                 # normalize keys to strings
                 mk = str(mk)
-                baseline_map[mk] = dict(item)  # keep raw item
+                item = dict(item)  # keep raw item
+                item.pop(MAX_DATE_PARTITION, None)  # index bookkeeping, not module data
+                baseline_map[mk] = item
                 if "id" in item:
                     existing_generated_ids.add(item["id"])
     except Exception as e:
@@ -212,16 +445,26 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
 
     print(f"ℹ️ Found {len(baseline_map)} modules in DynamoDB and {len(existing_generated_ids)} existing generated ids")
 
-    # Compute content_hash for baseline items using same canonical_fields
-    baseline_hashes = {}
-    for mk, item in baseline_map.items():
-        # build a normalized dict with canonical_fields only
+    print(f"🔐 SHA-256 backend: {_sha256_backend()}")
+
+    # content_hash is persisted with every write, so stored hashes are reused as-is;
+    # only older rows without one are hashed here, using the same canonical_fields
+    # (missing fields hash as "", same as an explicit None)
+    baseline_hashes = {mk: item["content_hash"] for mk, item in baseline_map.items() if item.get("content_hash")}
+    unhashed = {mk: item for mk, item in baseline_map.items() if mk not in baseline_hashes}
+    if projected and unhashed:
+        # Projected items lack the canonical fields, so hashing them would mark every
+        # older row as changed: re-read just those rows in full by id (the hash key).
+        # Rows that can't be fetched stay unhashed and are rewritten, as on a first run.
+        mk_by_id = {item["id"]: mk for mk, item in unhashed.items() if item.get("id")}
+        print(f"📥 Fetching {len(mk_by_id)} older item(s) without a stored content_hash ...")
         try:
-            # ensure keys exist even if missing
-            normalized = {k: item.get(k) for k in canonical_fields}
-            baseline_hashes[mk] = _compute_content_hash_for_record(normalized, canonical_fields)
-        except Exception:
-            baseline_hashes[mk] = ""
+            full_items = _batch_get_by_id(ddb, table_name, mk_by_id)
+        except Exception as e:
+            print(f"⚠️ Warning: BatchGetItem error: {e}. Treating those modules as changed.")
+            full_items = []
+        unhashed = {mk_by_id[item["id"]]: item for item in full_items if item.get("id") in mk_by_id}
+    baseline_hashes.update(_compute_content_hashes(unhashed, canonical_fields))
 
     # Build incoming current_map keyed by module_key
     current_map: Dict[str, Dict] = {}
@@ -235,9 +478,7 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
     print(f"ℹ️ Incoming records to evaluate: {len(current_map)} modules")
 
     # Compute content_hash for incoming records
-    current_hashes = {}
-    for mk, rec in current_map.items():
-        current_hashes[mk] = _compute_content_hash_for_record(rec, canonical_fields)
+    current_hashes = _compute_content_hashes(current_map, canonical_fields)
 
     # Determine which modules changed or are new
     changed_keys = []
@@ -251,7 +492,7 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
 
     # Prepare items to write: set id (preserve existing id if any), module_id/module_key, uploaded_date, cve_id
     to_write = []
-    existing_ids = set(existing_generated_ids)  # copy
+    year_max = _max_meta_seq_by_year(existing_generated_ids)  # bucketed once, not per new id
     for mk in changed_keys:
         rec = dict(current_map[mk])
         # preserve id if baseline had it
@@ -262,8 +503,7 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
         else:
             # generate new id for this year
             year = int(str(rec.get("uploaded_date") or time.strftime("%Y"))[:4])
-            gen_id = _next_meta_id_for_year(existing_ids, year)
-            existing_ids.add(gen_id)
+            gen_id = _next_meta_id_for_year(year_max, year)
         rec["id"] = gen_id
         # keep both module_key and module_id for compatibility
         rec["module_key"] = mk
@@ -271,7 +511,7 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
         rec["uploaded_date"] = rec.get("uploaded_date") or time.strftime("%Y-%m-%d")
         if not rec.get("cve_id"):
             rec["cve_id"] = _extract_cve(rec.get("references"))
-        # include computed content_hash for reference (stored in baseline but not strictly required in DDB)
+        # persisted so the next sync can diff against it without rehashing the row
         rec["content_hash"] = current_hashes.get(mk, "")
         to_write.append(rec)
 
@@ -280,34 +520,32 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
     if to_write:
         chunk_size = int(cfg.get("BATCH_WRITE_CHUNK_SIZE", 500))
         total = len(to_write)
+        progress_lock = threading.Lock()  # progress_fn is called from every writer thread
         def progress_fn(n):
             nonlocal written
-            written += n
-            if written % cfg.get("BATCH_PROGRESS_INTERVAL", 500) == 0 or written == total:
-                print(f"⬆️ Batch wrote {written}/{total}")
-        # chunk and write
-        chunk = []
-        for rec in to_write:
-            chunk.append(rec)
-            if len(chunk) >= chunk_size:
-                _write_chunk(table, chunk, progress_fn)
-                chunk = []
-        if chunk:
-            _write_chunk(table, chunk, progress_fn)
+            with progress_lock:
+                written += n
+                if written % cfg.get("BATCH_PROGRESS_INTERVAL", 500) == 0 or written == total:
+                    print(f"⬆️ Batch wrote {written}/{total}")
+        # chunk and write, up to `concurrency` chunks in flight
+        chunks = [to_write[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as ex:
+            futures = [ex.submit(_write_chunk, table, chunk, progress_fn) for chunk in chunks]
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"❌ Batch write chunk failed: {e}")
 
         print(f"✅ Uploaded {written} item(s) to DynamoDB")
     else:
         print("ℹ️ Nothing to write to DynamoDB.")
 
-    # Build merged baseline (map of module_key -> merged entry)
-    merged = {}
-    # start with baseline entries (existing ones)
-    for mk, item in baseline_map.items():
-        merged[mk] = dict(item)
-    # overwrite / add with current_map entries (preserve id where present)
-    for mk, rec in current_map.items():
+    # Merged baseline (module_key -> entry), produced lazily in baseline order:
+    # existing entries as-is unless overwritten by current_map, then new modules
+    def merged_entry(mk, rec):
         entry = dict(rec)
-        base_entry = merged.get(mk, {}) or {}
+        base_entry = baseline_map.get(mk, {}) or {}
         # prefer existing id
         if not entry.get("id") and base_entry.get("id"):
             entry["id"] = base_entry.get("id")
@@ -317,15 +555,20 @@ def sync_records_to_dynamodb_and_store_baseline(records: List[Dict], json_bytes:
             entry["cve_id"] = base_entry.get("cve_id") or _extract_cve(entry.get("references"))
         # include content_hash for stable S3 baseline if you want to keep hashing
         entry["content_hash"] = current_hashes.get(mk, baseline_hashes.get(mk, ""))
-        merged[mk] = entry
+        return entry
+
+    def merged_entries():
+        for mk, item in baseline_map.items():
+            yield merged_entry(mk, current_map[mk]) if mk in current_map else item
+        for mk, rec in current_map.items():
+            if mk not in baseline_map:
+                yield merged_entry(mk, rec)
 
     # Upload merged baseline to S3 (unless skipped)
     if not cfg.get("SKIP_S3_UPLOAD", False):
         try:
-            baseline_list = list(merged.values())
-            baseline_bytes = json.dumps(baseline_list, ensure_ascii=False, indent=2).encode("utf-8")
             print(f"⬆️ Uploading baseline JSON to s3://{s3_bucket}/{baseline_key}")
-            _s3_put_bytes(s3, s3_bucket, baseline_key, baseline_bytes)
+            _upload_json_array(s3, s3_bucket, baseline_key, merged_entries())
             print("✅ Baseline upload complete")
             s3_uploaded = True
         except Exception as e: